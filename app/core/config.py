@@ -1,11 +1,25 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Optional, Literal
 
 class Settings(BaseSettings):
     # Database
     MONGODB_URL: str = "mongodb://localhost:27017"
     DATABASE_NAME: str = "vehicle_management"
     
+    # MongoDB client / connection pool
+    MONGODB_MAX_POOL_SIZE: int = 100
+    MONGODB_MIN_POOL_SIZE: int = 0
+    MONGODB_MAX_IDLE_TIME_MS: Optional[int] = None
+    MONGODB_WAIT_QUEUE_TIMEOUT_MS: Optional[int] = None
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS: int = 30000
+    MONGODB_CONNECT_TIMEOUT_MS: int = 20000
+    MONGODB_COMPRESSORS: str = ""
+    MONGODB_READ_PREFERENCE: str = "primary"
+    
+    # Read preference for heavy read-only paths (dashboard, logs, exports)
+    MONGODB_ANALYTICS_READ_PREFERENCE: str = "secondaryPreferred"
+    MONGODB_ANALYTICS_MAX_STALENESS_SECONDS: int = -1
+    
     # JWT
     SECRET_KEY: str = "your-secret-key-here-change-in-production"
     ALGORITHM: str = "HS256"
@@ -14,6 +28,56 @@ class Settings(BaseSettings):
     # CORS
     CORS_ORIGINS: str = "*"
     
+    # Authenticated-user cache
+    USER_CACHE_MAX_SIZE: int = 1024
+    USER_CACHE_TTL_SECONDS: float = 60.0
+    
+    # Verified-token cache
+    TOKEN_CACHE_MAX_SIZE: int = 10000
+    TOKEN_CACHE_TTL_SECONDS: float = 300.0
+    
+    # Password hashing
+    PASSWORD_HASH_ROUNDS: int = 12
+    PASSWORD_HASH_EXECUTOR: Literal["thread", "process"] = "thread"
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_MAX_CONCURRENCY: int = 8
+    
+    # Audit log writer
+    AUDIT_LOG_ASYNC: bool = True
+    AUDIT_LOG_QUEUE_SIZE: int = 10000
+    AUDIT_LOG_BATCH_SIZE: int = 500
+    AUDIT_LOG_FLUSH_INTERVAL_SECONDS: float = 1.0
+    AUDIT_LOG_QUEUE_FULL_POLICY: Literal["block", "drop", "inline"] = "block"
+    AUDIT_LOG_WRITE_RETRIES: int = 3
+    AUDIT_LOG_RETRY_BACKOFF_SECONDS: float = 0.5
+    
+    # VIEW audit events: one entry per (user, entity) per window, optionally sampled
+    AUDIT_VIEW_COALESCE_SECONDS: float = 60.0
+    AUDIT_VIEW_SAMPLE_RATE: float = 1.0
+    AUDIT_VIEW_MAX_PENDING: int = 10000
+    
+    # Audit log retention (0 keeps logs forever) and optional monthly collections
+    LOG_RETENTION_DAYS: int = 0
+    LOG_PARTITIONING: Literal["none", "monthly"] = "none"
+    LOG_RETENTION_CHECK_SECONDS: float = 3600.0
+    
+    # Dashboard counters (0 disables periodic reconciliation)
+    FLEET_STATS_RECONCILE_SECONDS: float = 600.0
+    
+    # Bulk vehicle import
+    IMPORT_BATCH_SIZE: int = 1000
+    IMPORT_MAX_REPORTED_ERRORS: int = 1000
+    
+    # Build models from stored documents without re-validation
+    TRUSTED_READS: bool = True
+    
+    # GET /vehicles list response cache (TTL bounds staleness across workers; 0 disables)
+    VEHICLE_LIST_CACHE_MAX_SIZE: int = 256
+    VEHICLE_LIST_CACHE_TTL_SECONDS: float = 5.0
+    
+    # Streaming exports
+    EXPORT_BATCH_SIZE: int = 1000
+    
     class Config:
         env_file = ".env"
 
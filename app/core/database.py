@@ -1,20 +1,132 @@
+import asyncio
+import threading
+import time
 from motor.motor_asyncio import AsyncIOMotorClient
-from typing import Optional
+from pymongo import monitoring
+from pymongo.read_preferences import (
+    Nearest, Primary, PrimaryPreferred, Secondary, SecondaryPreferred
+)
+from pymongo.errors import OperationFailure
+from typing import Optional, Iterable, Dict, List, Any
 from app.core.config import settings
 
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """Connection pool counters: checked-out connections and checkout wait time"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.open_connections = 0
+        self.checked_out = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def pool_created(self, event): pass
+    def pool_ready(self, event): pass
+    def pool_cleared(self, event): pass
+    def pool_closed(self, event): pass
+    def connection_ready(self, event): pass
+
+    def connection_created(self, event):
+        with self._lock:
+            self.open_connections += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open_connections -= 1
+
+    def connection_check_out_started(self, event):
+        # Check-out start and completion happen on the same driver thread
+        self._local.started = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        wait = time.perf_counter() - getattr(self._local, "started", time.perf_counter())
+        with self._lock:
+            self.checked_out += 1
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.checkout_failures += 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "maxPoolSize": settings.MONGODB_MAX_POOL_SIZE,
+                "minPoolSize": settings.MONGODB_MIN_POOL_SIZE,
+                "openConnections": self.open_connections,
+                "checkedOut": self.checked_out,
+                "checkouts": self.checkouts,
+                "checkoutFailures": self.checkout_failures,
+                "avgWaitMs": round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "maxWaitMs": round(self.max_wait * 1000, 3)
+            }
+
+READ_PREFERENCES = {
+    "primary": Primary,
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest
+}
+
+def analytics_read_preference():
+    """Read preference for heavy read-only queries that tolerate replication lag"""
+    mode = READ_PREFERENCES[settings.MONGODB_ANALYTICS_READ_PREFERENCE]
+    if mode is Primary:
+        return Primary()
+    return mode(max_staleness=settings.MONGODB_ANALYTICS_MAX_STALENESS_SECONDS)
+
 class Database:
     client: Optional[AsyncIOMotorClient] = None
     database = None
 
 db = Database()
+pool_stats = PoolStatsListener()
+
+def client_options() -> Dict[str, Any]:
+    """Motor client keyword arguments built from Settings"""
+    options = {
+        "maxPoolSize": settings.MONGODB_MAX_POOL_SIZE,
+        "minPoolSize": settings.MONGODB_MIN_POOL_SIZE,
+        "serverSelectionTimeoutMS": settings.MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+        "connectTimeoutMS": settings.MONGODB_CONNECT_TIMEOUT_MS,
+        "readPreference": settings.MONGODB_READ_PREFERENCE
+    }
+    if settings.MONGODB_MAX_IDLE_TIME_MS is not None:
+        options["maxIdleTimeMS"] = settings.MONGODB_MAX_IDLE_TIME_MS
+    if settings.MONGODB_WAIT_QUEUE_TIMEOUT_MS is not None:
+        options["waitQueueTimeoutMS"] = settings.MONGODB_WAIT_QUEUE_TIMEOUT_MS
+    if settings.MONGODB_COMPRESSORS:
+        options["compressors"] = settings.MONGODB_COMPRESSORS
+    return options
 
 async def get_database():
     return db.database
 
 async def connect_to_mongo():
     """Create database connection"""
-    db.client = AsyncIOMotorClient(settings.MONGODB_URL)
+    db.client = AsyncIOMotorClient(
+        settings.MONGODB_URL,
+        event_listeners=[pool_stats],
+        **client_options()
+    )
     db.database = db.client[settings.DATABASE_NAME]
+    
+    # Open minPoolSize connections now instead of on the first requests
+    if settings.MONGODB_MIN_POOL_SIZE > 0:
+        await asyncio.gather(*[
+            db.client.admin.command("ping")
+            for _ in range(settings.MONGODB_MIN_POOL_SIZE)
+        ])
     print("Connected to MongoDB")
 
 async def close_mongo_connection():
@@ -23,7 +135,69 @@ async def close_mongo_connection():
         db.client.close()
         print("Disconnected from MongoDB")
 
-async def get_collection(collection_name: str):
+async def get_collection(collection_name: str, analytics: bool = False):
     """Get a collection from the database"""
     database = await get_database()
-    return database[collection_name]
\ No newline at end of file
+    collection = database[collection_name]
+    # Heavy read-only paths may read from secondaries; auth and post-write reads may not
+    if analytics:
+        return collection.with_options(read_preference=analytics_read_preference())
+    return collection
+
+async def ensure_indexes(services: Iterable[Any]) -> Dict[str, Dict[str, List[str]]]:
+    """Create the indexes each service declares and report what exists"""
+    database = await get_database()
+    
+    for service in services:
+        collection = database[service.collection_name]
+        existing = [index["name"] async for index in collection.list_indexes()]
+        # Indexes a service has replaced would otherwise be maintained on every write
+        for name in getattr(service, "retired_indexes", []):
+            if name in existing:
+                try:
+                    await collection.drop_index(name)
+                    print(f"Dropped retired index {name} on {service.collection_name}")
+                except OperationFailure as e:
+                    print(f"Could not drop retired index {name} on {service.collection_name}: {e}")
+        for index in service.indexes:
+            # One at a time so a single conflicting index does not block the rest
+            try:
+                await collection.create_indexes([index])
+            except OperationFailure as e:
+                print(f"Could not create index {index.document['name']} on {service.collection_name}: {e}")
+    
+    report = await get_index_report(services)
+    
+    # Some writes rely on an index alone (e.g. unique VehRegNo) and must not run without it
+    for service in services:
+        missing = [
+            name for name in getattr(service, "required_indexes", [])
+            if name in report[service.collection_name]["missing"]
+        ]
+        if missing:
+            raise RuntimeError(
+                f"Required indexes {', '.join(missing)} on {service.collection_name} could not be created; "
+                "resolve the conflicting data (e.g. duplicate values) and restart"
+            )
+    
+    return report
+
+async def get_index_report(services: Iterable[Any]) -> Dict[str, Dict[str, List[str]]]:
+    """Compare declared indexes with the ones present in the database"""
+    database = await get_database()
+    report = {}
+    
+    for service in services:
+        collection = database[service.collection_name]
+        existing = set()
+        async for index in collection.list_indexes():
+            existing.add(index["name"])
+        
+        declared = [index.document["name"] for index in service.indexes]
+        report[service.collection_name] = {
+            "present": [name for name in declared if name in existing],
+            "missing": [name for name in declared if name not in existing],
+            "undeclared": sorted(existing - set(declared) - {"_id_"})
+        }
+    
+    return report
\ No newline at end of file
@@ -0,0 +1,26 @@
+import asyncio
+from typing import Awaitable, Callable, List
+
+_tasks: List[asyncio.Task] = []
+
+def start_periodic(name: str, interval: float, func: Callable[[], Awaitable]) -> None:
+    """Run func every interval seconds until stop_periodic is called"""
+    if interval <= 0:
+        return
+
+    async def runner():
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await func()
+            except Exception as e:
+                print(f"Periodic task {name} failed: {e}")
+
+    _tasks.append(asyncio.create_task(runner(), name=name))
+
+async def stop_periodic() -> None:
+    """Cancel every task started with start_periodic"""
+    for task in _tasks:
+        task.cancel()
+    await asyncio.gather(*_tasks, return_exceptions=True)
+    _tasks.clear()
@@ -1,25 +1,65 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
 import uvicorn
-from app.core.database import connect_to_mongo, close_mongo_connection
-from app.routers import auth, vehicles, dashboard, logs
+from app.core.database import connect_to_mongo, close_mongo_connection, ensure_indexes, pool_stats
+from app.routers import auth, vehicles, dashboard, logs, users
+from app.routers.auth import get_current_user_dependency
+from app.services.user_service import UserService
+from app.services.vehicle_service import VehicleService
+from app.services.log_service import LogService
+from app.services.log_rollups import LogRollupService
+from app.services.log_writer import log_writer
+from app.services.view_events import view_events
+from app.services.log_partitions import apply_retention, drop_expired_partitions
 from app.core.config import settings
+from app.core.security import token_cache, shutdown_password_hasher
+from app.core.tasks import start_periodic, stop_periodic
+from app.core.responses import FastJSONResponse
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     await connect_to_mongo()
+    app.state.index_report = await ensure_indexes(
+        [VehicleService(), UserService(), LogService(), LogRollupService()]
+    )
+    print(f"Index report: {app.state.index_report}")
+    await apply_retention()
+    if settings.AUDIT_LOG_ASYNC:
+        await log_writer.start()
+    await VehicleService().reconcile_fleet_stats()
+    view_events.start()
+    start_periodic(
+        "fleet-stats-reconcile",
+        settings.FLEET_STATS_RECONCILE_SECONDS,
+        VehicleService().reconcile_fleet_stats
+    )
+    start_periodic(
+        "audit-view-flush",
+        settings.AUDIT_VIEW_COALESCE_SECONDS,
+        view_events.flush
+    )
+    start_periodic(
+        "log-partition-retention",
+        settings.LOG_RETENTION_CHECK_SECONDS,
+        drop_expired_partitions
+    )
     yield
     # Shutdown
+    await stop_periodic()
+    await view_events.stop()
+    await log_writer.stop()
+    shutdown_password_hasher()
     await close_mongo_connection()
 
 app = FastAPI(
     title="Vehicle Management System API",
     description="A comprehensive vehicle management system with CRUD operations and logging",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
 # CORS middleware
@@ -36,6 +76,7 @@ app.include_router(auth.router, prefix="/api/v1/auth", tags=["Authentication"])
 app.include_router(vehicles.router, prefix="/api/v1/vehicles", tags=["Vehicles"])
 app.include_router(dashboard.router, prefix="/api/v1/dashboard", tags=["Dashboard"])
 app.include_router(logs.router, prefix="/api/v1/logs", tags=["Logs"])
+app.include_router(users.router, prefix="/api/v1/users", tags=["Users"])
 
 @app.get("/")
 async def root():
@@ -51,6 +92,20 @@ async def root():
 async def health_check():
     return JSONResponse(content={"status": "healthy"})
 
+@app.get("/metrics", dependencies=[Depends(get_current_user_dependency)])
+async def metrics():
+    return JSONResponse(
+        content={
+            "userCache": UserService.cache_stats(),
+            "tokenCache": token_cache.stats(),
+            "vehicleListCache": VehicleService.cache_stats(),
+            "auditLogWriter": log_writer.stats(),
+            "auditViewEvents": view_events.stats(),
+            "indexes": getattr(app.state, "index_report", None),
+            "mongoPool": pool_stats.stats()
+        }
+    )
+
 if __name__ == "__main__":
     uvicorn.run(
         "app.main:app",
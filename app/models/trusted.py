@@ -0,0 +1,26 @@
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Type
+from pydantic import BaseModel
+from app.core.config import settings
+
+@lru_cache(maxsize=None)
+def model_fields(model_cls: Type[BaseModel]) -> List[str]:
+    """Document keys of a response model, with the id alias as _id"""
+    return [field.alias or name for name, field in model_cls.model_fields.items()]
+
+def trusted_row(document: Dict[str, Any], fields: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Return a stored document as a response row, with _id as a string"""
+    if fields is not None:
+        row = {field: document[field] for field in fields if field in document}
+    else:
+        row = dict(document)
+    row["_id"] = str(document["_id"])
+    return row
+
+def from_document(model_cls: Type[BaseModel], document: Dict[str, Any]) -> Any:
+    """Build a list item from a document we wrote ourselves"""
+    # Documents were validated on the way in; serialize them once instead of
+    # re-validating into a model and dumping it again
+    if settings.TRUSTED_READS:
+        return trusted_row(document, model_fields(model_cls))
+    return model_cls(**document)
@@ -133,6 +133,7 @@ class VehicleResponse(VehicleBase):
     UpdatedAt: datetime = Field(..., description="Update Timestamp")
     IsActive: bool = Field(default=True, description="Is Active")
     isDeleted: bool = Field(default=False, description="Is Deleted")
+    version: int = Field(default=0, description="Incremented on every update")
 
     model_config = ConfigDict(
         populate_by_name=True,
@@ -141,4 +142,29 @@ class VehicleResponse(VehicleBase):
     )
 
 class VehicleInDB(VehicleResponse):
-    pass
\ No newline at end of file
+    pass
+
+class VehicleSummary(BaseModel):
+    id: Optional[PyObjectId] = Field(default_factory=PyObjectId, alias="_id")
+    VehRegNo: str = Field(..., description="Vehicle Registration Number")
+    MakeType: str = Field(..., description="Vehicle Make Type")
+    Model: str = Field(..., description="Vehicle Model")
+    PresentUnitName: str = Field(..., description="Present Unit Name")
+    status: VehicleStatus = Field(..., description="Vehicle Status")
+    vehicle_type: VehicleType = Field(..., description="Vehicle Type")
+
+    model_config = ConfigDict(
+        populate_by_name=True,
+        arbitrary_types_allowed=True,
+        json_encoders={ObjectId: str}
+    )
+
+VEHICLE_SUMMARY_FIELDS = ["VehRegNo", "MakeType", "Model", "PresentUnitName", "status", "vehicle_type"]
+
+VEHICLE_FIELDS = ["_id"] + [field for field in VehicleResponse.model_fields if field != "id"]
+
+# Keyset seeks use $gt/$lt, which never match null or missing values; cursor mode may only
+# sort on fields every stored vehicle has
+VEHICLE_CURSOR_SORT_FIELDS = [
+    field for field, info in VehicleBase.model_fields.items() if info.is_required()
+] + ["CreatedBy", "CreatedAt", "UpdatedBy", "UpdatedAt"]
\ No newline at end of file
@@ -1,3 +1,4 @@
+import asyncio
 from fastapi import APIRouter, Depends, HTTPException, status
 from app.models.user import UserInDB
 from app.services.vehicle_service import VehicleService
@@ -15,13 +16,15 @@ async def get_dashboard_data(
     log_service = LogService()
     
     try:
-        # Get vehicle statistics
-        total_vehicles = await vehicle_service.get_total_vehicles()
-        vehicles_by_status = await vehicle_service.get_vehicles_by_status()
-        vehicles_by_type = await vehicle_service.get_vehicles_by_type()
+        # Get vehicle statistics and recent logs concurrently
+        fleet_summary, recent_logs = await asyncio.gather(
+            vehicle_service.get_fleet_stats(),
+            log_service.get_recent_logs(limit=10)
+        )
         
-        # Get recent logs
-        recent_logs = await log_service.get_recent_logs(limit=10)
+        total_vehicles = fleet_summary["total"]
+        vehicles_by_status = fleet_summary["byStatus"]
+        vehicles_by_type = fleet_summary["byType"]
         
         # Prepare status counts
         on_duty_count = vehicles_by_status.get("ON_DUTY", 0)
@@ -1,12 +1,137 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from typing import Optional
+from fastapi.responses import StreamingResponse
+from typing import Optional, Dict, Any
 from datetime import datetime
+from app.core.config import settings
+from app.core.responses import FastJSONResponse
 from app.models.user import UserInDB
 from app.services.log_service import LogService
 from app.routers.auth import get_current_user_dependency
+from app.utils.export import stream_csv, stream_ndjson
 
 router = APIRouter()
 
+LOG_EXPORT_COLUMNS = [
+    "_id", "action", "entityType", "entityId", "userId",
+    "userName", "timestamp", "details", "ipAddress"
+]
+
+def _build_log_filters(
+    action: Optional[str] = None,
+    entity_type: Optional[str] = None,
+    user_id: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None
+) -> Dict[str, Any]:
+    """Build the log query from router filters"""
+    filters = {}
+    
+    if action:
+        filters["action"] = action
+    if entity_type:
+        filters["entityType"] = entity_type
+    if user_id:
+        filters["userId"] = user_id
+    
+    # Date filtering
+    if start_date or end_date:
+        date_filter = {}
+        try:
+            if start_date:
+                date_filter["$gte"] = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
+            if end_date:
+                date_filter["$lte"] = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
+        except ValueError as e:
+            raise ValueError(f"Invalid date format: {str(e)}")
+        if date_filter:
+            filters["timestamp"] = date_filter
+    
+    return filters
+
+@router.get("/export")
+async def export_logs(
+    export_format: str = Query("ndjson", alias="format", regex="^(csv|ndjson)$"),
+    action: Optional[str] = None,
+    entity_type: Optional[str] = None,
+    user_id: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    current_user: UserInDB = Depends(get_current_user_dependency)
+):
+    """Stream matching logs as CSV or NDJSON"""
+    log_service = LogService()
+    
+    try:
+        filters = _build_log_filters(action, entity_type, user_id, start_date, end_date)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    documents = log_service.iter_logs(filters=filters, batch_size=settings.EXPORT_BATCH_SIZE)
+    
+    if export_format == "csv":
+        return StreamingResponse(
+            stream_csv(documents, LOG_EXPORT_COLUMNS),
+            media_type="text/csv",
+            headers={"Content-Disposition": "attachment; filename=logs.csv"}
+        )
+    
+    return StreamingResponse(
+        stream_ndjson(documents),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": "attachment; filename=logs.ndjson"}
+    )
+
+@router.get("/activity", response_model=dict)
+async def get_activity(
+    granularity: str = Query("hour", regex="^(hour|day)$"),
+    group_by: Optional[str] = Query(None, regex="^(action|entityType|userId)$"),
+    action: Optional[str] = None,
+    entity_type: Optional[str] = None,
+    user_id: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    current_user: UserInDB = Depends(get_current_user_dependency)
+):
+    """Activity histogram per hour or day, served from the audit rollups"""
+    log_service = LogService()
+    
+    try:
+        filters = _build_log_filters(action, entity_type, user_id, start_date, end_date)
+        date_filter = filters.pop("timestamp", {})
+        
+        buckets = await log_service.get_activity_histogram(
+            granularity=granularity,
+            start=date_filter.get("$gte"),
+            end=date_filter.get("$lte"),
+            filters=filters,
+            group_by=group_by
+        )
+        
+        return FastJSONResponse(
+            content={
+                "success": True,
+                "message": "Activity retrieved successfully",
+                "data": {
+                    "granularity": granularity,
+                    "groupBy": group_by,
+                    "buckets": buckets
+                }
+            }
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
 @router.get("/", response_model=dict)
 async def get_logs(
     page: int = Query(1, ge=1),
@@ -16,54 +141,66 @@ async def get_logs(
     user_id: Optional[str] = None,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
+    paginate: str = Query("page", regex="^(page|cursor)$"),
+    cursor: Optional[str] = None,
+    count: Optional[str] = Query(None, regex="^(exact|estimated|none)$"),
     current_user: UserInDB = Depends(get_current_user_dependency)
 ):
     """Get logs with pagination and filtering"""
     log_service = LogService()
     
     try:
-        filters = {}
-        
-        if action:
-            filters["action"] = action
-        if entity_type:
-            filters["entityType"] = entity_type
-        if user_id:
-            filters["userId"] = user_id
+        filters = _build_log_filters(action, entity_type, user_id, start_date, end_date)
         
-        # Date filtering
-        if start_date or end_date:
-            date_filter = {}
-            if start_date:
-                date_filter["$gte"] = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
-            if end_date:
-                date_filter["$lte"] = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
-            if date_filter:
-                filters["timestamp"] = date_filter
+        # Keyset mode: seek past the previous page's nextCursor instead of skipping
+        if paginate == "cursor" or cursor:
+            logs, next_cursor, total_count = await log_service.get_logs_by_cursor(
+                limit=limit,
+                filters=filters,
+                cursor=cursor,
+                count=count or "none"
+            )
+            
+            # Rows go straight to the response class, skipping response_model serialization
+            return FastJSONResponse(
+                content={
+                    "success": True,
+                    "message": "Logs retrieved successfully",
+                    "data": {
+                        "data": logs,
+                        "total": total_count,
+                        "limit": limit,
+                        "nextCursor": next_cursor
+                    }
+                }
+            )
         
         logs, total_count = await log_service.get_logs_paginated(
             page=page,
             limit=limit,
-            filters=filters
+            filters=filters,
+            count=count or "exact"
         )
         
-        total_pages = (total_count + limit - 1) // limit
+        total_pages = (total_count + limit - 1) // limit if total_count is not None else None
         
-        return {
-            "success": True,
-            "message": "Logs retrieved successfully",
-            "data": {
-                "data": logs,
-                "total": total_count,
-                "page": page,
-                "limit": limit,
-                "totalPages": total_pages
+        return FastJSONResponse(
+            content={
+                "success": True,
+                "message": "Logs retrieved successfully",
+                "data": {
+                    "data": logs,
+                    "total": total_count,
+                    "page": page,
+                    "limit": limit,
+                    "totalPages": total_pages
+                }
             }
-        }
+        )
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid date format: {str(e)}"
+            detail=str(e)
         )
     except Exception as e:
         raise HTTPException(
@@ -0,0 +1,47 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from typing import Optional
+from app.core.responses import FastJSONResponse
+from app.models.user import UserInDB
+from app.services.log_service import LogService
+from app.routers.auth import get_current_user_dependency
+
+router = APIRouter()
+
+@router.get("/{user_id}/activity", response_model=dict)
+async def get_user_activity(
+    user_id: str,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    current_user: UserInDB = Depends(get_current_user_dependency)
+):
+    """Get a user's audit activity, newest first; pass nextCursor back as cursor for older entries"""
+    log_service = LogService()
+    
+    try:
+        logs, next_cursor = await log_service.get_logs_by_user(
+            user_id=user_id,
+            limit=limit,
+            cursor=cursor
+        )
+        
+        return FastJSONResponse(
+            content={
+                "success": True,
+                "message": "User activity retrieved successfully",
+                "data": {
+                    "data": logs,
+                    "limit": limit,
+                    "nextCursor": next_cursor
+                }
+            }
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
\ No newline at end of file
@@ -1,61 +1,390 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from typing import Optional, List
-from app.models.vehicle import VehicleCreate, VehicleUpdate, VehicleResponse
+import codecs
+import csv
+import json
+from itertools import islice
+from fastapi import APIRouter, Depends, HTTPException, status, Query, UploadFile, File, Header, Response
+from fastapi.responses import StreamingResponse
+from pymongo.errors import DuplicateKeyError
+from starlette.concurrency import run_in_threadpool
+from typing import Optional, List, Iterator, Tuple, Dict, Any
+from app.core.config import settings
+from app.core.responses import FastJSONResponse
+from app.models.vehicle import VehicleCreate, VehicleUpdate, VehicleResponse, VEHICLE_FIELDS
 from app.models.user import UserInDB
-from app.services.vehicle_service import VehicleService
+from app.services.vehicle_service import VehicleService, VersionConflictError, list_cache
 from app.services.log_service import LogService
 from app.routers.auth import get_current_user_dependency
+from app.utils.export import stream_csv, stream_ndjson
 
 router = APIRouter()
 
+def _build_vehicle_filters(
+    search: Optional[str] = None,
+    search_mode: str = "regex",
+    vehicle_status: Optional[str] = None,
+    vehicle_type: Optional[str] = None,
+    fuel_type: Optional[str] = None
+) -> Dict[str, Any]:
+    """Build the vehicle filters understood by VehicleService"""
+    filters = {}
+    if search:
+        filters["search"] = search
+        filters["search_mode"] = search_mode
+    if vehicle_status:
+        filters["status"] = vehicle_status
+    if vehicle_type:
+        filters["vehicle_type"] = vehicle_type
+    if fuel_type:
+        filters["fuel_type"] = fuel_type
+    return filters
+
+def _etag(version: int) -> str:
+    """Entity tag for a vehicle version"""
+    return f'"{version}"'
+
+def _if_match_version(if_match: Optional[str]) -> Optional[int]:
+    """Version a PUT is conditional on, or None when any version will do"""
+    if if_match is None or if_match.strip() == "*":
+        return None
+    tag = if_match.strip()
+    # If-Match uses strong comparison, and a conditional update needs one version
+    if tag.startswith("W/") or "," in tag or not (tag.startswith('"') and tag.endswith('"')):
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="If-Match must be a single strong entity tag"
+        )
+    try:
+        return int(tag[1:-1])
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="Vehicle has been modified"
+        )
+
+def _none_match(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether If-None-Match lists the current entity tag (weak comparison)"""
+    if if_none_match is None:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in [tag[2:] if tag.startswith("W/") else tag for tag in tags]
+
+def _parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Validate a comma-separated fields= selection"""
+    if not fields:
+        return None
+    selected = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in selected if field not in VEHICLE_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    if not selected:
+        return None
+    # _id is always returned; fields=_id alone is an explicit ids-only selection
+    return [field for field in selected if field != "_id"]
+
+def _detect_import_format(upload: UploadFile, requested: Optional[str]) -> str:
+    if requested:
+        return requested
+    filename = (upload.filename or "").lower()
+    if filename.endswith((".ndjson", ".jsonl")) or "ndjson" in (upload.content_type or ""):
+        return "ndjson"
+    return "csv"
+
+def _iter_upload_rows(
+    upload: UploadFile,
+    file_format: str
+) -> Iterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]:
+    """Yield (row number, row, parse error) from an uploaded CSV or NDJSON file"""
+    # Lines are decoded one at a time so a bad byte fails its row, not the rest of the import
+    undecodable = []
+    
+    def decoded_lines() -> Iterator[str]:
+        for index, raw in enumerate(upload.file):
+            if index == 0 and raw.startswith(codecs.BOM_UTF8):
+                raw = raw[len(codecs.BOM_UTF8):]
+            try:
+                yield raw.decode("utf-8")
+            except UnicodeDecodeError:
+                undecodable.append(index)
+                yield raw.decode("utf-8", errors="replace")
+    
+    if file_format == "csv":
+        reader = csv.DictReader(decoded_lines())
+        row_number = 0
+        while True:
+            try:
+                row = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as e:
+                row_number += 1
+                undecodable.clear()
+                yield row_number, None, f"Invalid CSV: {str(e)}"
+                continue
+            row_number += 1
+            if undecodable:
+                undecodable.clear()
+                yield row_number, None, "Row is not valid UTF-8"
+                continue
+            # DictReader files cells beyond the header under the key None
+            if None in row:
+                yield row_number, None, "Too many columns"
+                continue
+            yield row_number, row, None
+    
+    row_number = 0
+    for line in decoded_lines():
+        if not line.strip():
+            continue
+        row_number += 1
+        if undecodable:
+            undecodable.clear()
+            yield row_number, None, "Row is not valid UTF-8"
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield row_number, None, f"Invalid JSON: {str(e)}"
+            continue
+        if not isinstance(row, dict):
+            yield row_number, None, "Expected a JSON object"
+            continue
+        yield row_number, row, None
+
 @router.get("/", response_model=dict)
 async def get_vehicles(
     page: int = Query(1, ge=1),
     limit: int = Query(10, ge=1, le=100),
     search: Optional[str] = None,
-    status: Optional[str] = None,
+    search_mode: str = Query("regex", regex="^(text|prefix|regex)$"),
+    vehicle_status: Optional[str] = Query(None, alias="status"),
     vehicle_type: Optional[str] = None,
     fuel_type: Optional[str] = None,
     sort_by: Optional[str] = None,
     sort_order: Optional[str] = Query("asc", regex="^(asc|desc)$"),
+    paginate: str = Query("page", regex="^(page|cursor)$"),
+    cursor: Optional[str] = None,
+    count: Optional[str] = Query(None, regex="^(exact|estimated|none)$"),
+    view: str = Query("full", regex="^(full|summary)$"),
+    fields: Optional[str] = None,
     current_user: UserInDB = Depends(get_current_user_dependency)
 ):
     """Get vehicles with pagination and filtering"""
     vehicle_service = VehicleService()
     
     try:
-        filters = {}
-        if search:
-            filters["search"] = search
-        if status:
-            filters["Status"] = status
-        if vehicle_type:
-            filters["VehicleType"] = vehicle_type
-        if fuel_type:
-            filters["FuelType"] = fuel_type
+        selected_fields = _parse_fields(fields)
+        filters = _build_vehicle_filters(search, search_mode, vehicle_status, vehicle_type, fuel_type)
         
         sorting = {}
         if sort_by:
             sorting[sort_by] = 1 if sort_order == "asc" else -1
         
+        # Identical polls share one rendered body until the next vehicle write
+        keyset = paginate == "cursor" or bool(cursor)
+        cache_key = (
+            VehicleService.list_cache_generation(),
+            tuple(sorted(filters.items())),
+            tuple(sorting.items()),
+            ("cursor", cursor) if keyset else ("page", page),
+            limit,
+            count,
+            view,
+            tuple(selected_fields) if selected_fields is not None else None
+        )
+        cached_body = list_cache.get(cache_key)
+        if cached_body is not None:
+            return Response(content=cached_body, media_type="application/json", headers={"X-Cache": "HIT"})
+        
+        # Keyset mode: seek past the previous page's nextCursor instead of skipping
+        if keyset:
+            vehicles, next_cursor, total_count = await vehicle_service.get_vehicles_by_cursor(
+                limit=limit,
+                filters=filters,
+                sorting=sorting,
+                cursor=cursor,
+                count=count or "none",
+                view=view,
+                fields=selected_fields
+            )
+            
+            # Rows go straight to the response class, skipping response_model serialization
+            response = FastJSONResponse(
+                content={
+                    "success": True,
+                    "message": "Vehicles retrieved successfully",
+                    "data": {
+                        "data": vehicles,
+                        "total": total_count,
+                        "limit": limit,
+                        "nextCursor": next_cursor
+                    }
+                },
+                headers={"X-Cache": "MISS"}
+            )
+            list_cache.set(cache_key, response.body)
+            return response
+        
         vehicles, total_count = await vehicle_service.get_vehicles_paginated(
             page=page,
             limit=limit,
             filters=filters,
-            sorting=sorting
+            sorting=sorting,
+            count=count or "exact",
+            view=view,
+            fields=selected_fields
         )
         
-        total_pages = (total_count + limit - 1) // limit
+        total_pages = (total_count + limit - 1) // limit if total_count is not None else None
+        
+        response = FastJSONResponse(
+            content={
+                "success": True,
+                "message": "Vehicles retrieved successfully",
+                "data": {
+                    "data": vehicles,
+                    "total": total_count,
+                    "page": page,
+                    "limit": limit,
+                    "totalPages": total_pages
+                }
+            },
+            headers={"X-Cache": "MISS"}
+        )
+        list_cache.set(cache_key, response.body)
+        return response
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+@router.get("/export")
+async def export_vehicles(
+    export_format: str = Query("ndjson", alias="format", regex="^(csv|ndjson)$"),
+    search: Optional[str] = None,
+    search_mode: str = Query("regex", regex="^(text|prefix|regex)$"),
+    vehicle_status: Optional[str] = Query(None, alias="status"),
+    vehicle_type: Optional[str] = None,
+    fuel_type: Optional[str] = None,
+    sort_by: Optional[str] = None,
+    sort_order: Optional[str] = Query("asc", regex="^(asc|desc)$"),
+    current_user: UserInDB = Depends(get_current_user_dependency)
+):
+    """Stream matching vehicles as CSV or NDJSON"""
+    vehicle_service = VehicleService()
+    
+    filters = _build_vehicle_filters(search, search_mode, vehicle_status, vehicle_type, fuel_type)
+    sorting = {sort_by: 1 if sort_order == "asc" else -1} if sort_by else {}
+    
+    documents = vehicle_service.iter_vehicles(
+        filters=filters,
+        sorting=sorting,
+        batch_size=settings.EXPORT_BATCH_SIZE
+    )
+    
+    if export_format == "csv":
+        return StreamingResponse(
+            stream_csv(documents, VEHICLE_FIELDS),
+            media_type="text/csv",
+            headers={"Content-Disposition": "attachment; filename=vehicles.csv"}
+        )
+    
+    return StreamingResponse(
+        stream_ndjson(documents),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": "attachment; filename=vehicles.ndjson"}
+    )
+
+@router.post("/import", response_model=dict)
+async def import_vehicles(
+    file: UploadFile = File(...),
+    file_format: Optional[str] = Query(None, alias="format", regex="^(csv|ndjson)$"),
+    current_user: UserInDB = Depends(get_current_user_dependency)
+):
+    """Bulk import vehicles from a CSV or NDJSON upload"""
+    vehicle_service = VehicleService()
+    log_service = LogService()
+    
+    try:
+        rows = _iter_upload_rows(file, _detect_import_format(file, file_format))
+        batch_size = settings.IMPORT_BATCH_SIZE
+        max_errors = settings.IMPORT_MAX_REPORTED_ERRORS
+        
+        total_rows = 0
+        imported_count = 0
+        error_count = 0
+        errors = []
+        aborted_at_row = None
+        abort_reason = None
+        
+        while True:
+            try:
+                # Parse the next chunk off the event loop; only one chunk is held at a time
+                chunk = await run_in_threadpool(lambda: list(islice(rows, batch_size)))
+                if not chunk:
+                    break
+                
+                chunk_errors = [
+                    {"row": row_number, "error": parse_error}
+                    for row_number, _, parse_error in chunk if parse_error
+                ]
+                inserted, insert_errors = await vehicle_service.import_vehicles_batch(
+                    rows=[(row_number, row) for row_number, row, parse_error in chunk if not parse_error],
+                    created_by=str(current_user.id)
+                )
+                total_rows += len(chunk)
+                imported_count += len(inserted)
+                
+                for error in chunk_errors + insert_errors:
+                    error_count += 1
+                    if len(errors) < max_errors:
+                        errors.append(error)
+                
+                # Log the creations in one batch per chunk
+                await log_service.create_logs([
+                    {
+                        "action": "CREATE",
+                        "entity_type": "vehicle",
+                        "entity_id": str(vehicle["_id"]),
+                        "user_id": str(current_user.id),
+                        "user_name": current_user.fullName,
+                        "details": {
+                            "VehRegNo": vehicle["VehRegNo"],
+                            "MakeType": vehicle["MakeType"],
+                            "Model": vehicle["Model"],
+                            "Status": vehicle["status"],
+                            "bulk_import": True
+                        }
+                    }
+                    for vehicle in inserted
+                ])
+            except Exception as e:
+                # Earlier chunks are already committed; report them rather than failing the request
+                aborted_at_row = total_rows + 1
+                abort_reason = str(e)
+                break
+        
+        if aborted_at_row is not None:
+            message = f"Import aborted at row {aborted_at_row}; {imported_count} vehicles imported before it"
+        else:
+            message = f"{imported_count} vehicles imported successfully"
         
         return {
-            "success": True,
-            "message": "Vehicles retrieved successfully",
+            "success": aborted_at_row is None,
+            "message": message,
             "data": {
-                "data": vehicles,
-                "total": total_count,
-                "page": page,
-                "limit": limit,
-                "totalPages": total_pages
+                "total_rows": total_rows,
+                "imported_count": imported_count,
+                "error_count": error_count,
+                "errors": sorted(errors, key=lambda error: error["row"]),
+                "errors_truncated": error_count > len(errors),
+                "aborted_at_row": aborted_at_row,
+                "abort_reason": abort_reason
             }
         }
     except Exception as e:
@@ -67,6 +396,8 @@ async def get_vehicles(
 @router.get("/{vehicle_id}", response_model=dict)
 async def get_vehicle(
     vehicle_id: str,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     current_user: UserInDB = Depends(get_current_user_dependency)
 ):
     """Get a specific vehicle by ID"""
@@ -91,6 +422,11 @@ async def get_vehicle(
             details={"VehRegNo": vehicle.VehRegNo}
         )
         
+        etag = _etag(vehicle.version)
+        if _none_match(if_none_match, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        response.headers["ETag"] = etag
+        
         return {
             "success": True,
             "message": "Vehicle retrieved successfully",
@@ -104,9 +440,50 @@ async def get_vehicle(
             detail=str(e)
         )
 
+@router.get("/{vehicle_id}/history", response_model=dict)
+async def get_vehicle_history(
+    vehicle_id: str,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    current_user: UserInDB = Depends(get_current_user_dependency)
+):
+    """Get a vehicle's audit history, newest first; pass nextCursor back as cursor for older entries"""
+    log_service = LogService()
+    
+    try:
+        logs, next_cursor = await log_service.get_logs_by_entity(
+            entity_type="vehicle",
+            entity_id=vehicle_id,
+            limit=limit,
+            cursor=cursor
+        )
+        
+        return FastJSONResponse(
+            content={
+                "success": True,
+                "message": "Vehicle history retrieved successfully",
+                "data": {
+                    "data": logs,
+                    "limit": limit,
+                    "nextCursor": next_cursor
+                }
+            }
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
 @router.post("/", response_model=dict)
 async def create_vehicle(
     vehicle_data: VehicleCreate,
+    response: Response,
     current_user: UserInDB = Depends(get_current_user_dependency)
 ):
     """Create a new vehicle"""
@@ -114,20 +491,18 @@ async def create_vehicle(
     log_service = LogService()
     
     try:
-        # Check if vehicle registration number already exists
-        existing_vehicle = await vehicle_service.get_vehicle_by_reg_no(vehicle_data.VehRegNo)
-        if existing_vehicle:
+        # Create vehicle; registration number uniqueness is enforced by the unique index
+        try:
+            vehicle = await vehicle_service.create_vehicle(
+                vehicle_data=vehicle_data,
+                created_by=str(current_user.id)
+            )
+        except DuplicateKeyError:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Vehicle with this registration number already exists"
             )
         
-        # Create vehicle
-        vehicle = await vehicle_service.create_vehicle(
-            vehicle_data=vehicle_data,
-            created_by=str(current_user.id)
-        )
-        
         # Log the creation
         await log_service.create_log(
             action="CREATE",
@@ -139,10 +514,12 @@ async def create_vehicle(
                 "VehRegNo": vehicle.VehRegNo,
                 "MakeType": vehicle.MakeType,
                 "Model": vehicle.Model,
-                "Status": vehicle.Status
+                "Status": vehicle.status
             }
         )
         
+        response.headers["ETag"] = _etag(vehicle.version)
+        
         return {
             "success": True,
             "message": "Vehicle created successfully",
@@ -160,37 +537,41 @@ async def create_vehicle(
 async def update_vehicle(
     vehicle_id: str,
     vehicle_data: VehicleUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
     current_user: UserInDB = Depends(get_current_user_dependency)
 ):
-    """Update a vehicle"""
+    """Update a vehicle; send If-Match with the ETag from GET to avoid overwriting concurrent changes"""
     vehicle_service = VehicleService()
     log_service = LogService()
     
     try:
-        # Check if vehicle exists
-        existing_vehicle = await vehicle_service.get_vehicle_by_id(vehicle_id)
-        if not existing_vehicle:
+        # Update vehicle; registration number uniqueness is enforced by the unique index
+        # and the If-Match version is checked by the same conditional write
+        try:
+            updated_vehicle = await vehicle_service.update_vehicle(
+                vehicle_id=vehicle_id,
+                vehicle_data=vehicle_data,
+                updated_by=str(current_user.id),
+                expected_version=_if_match_version(if_match)
+            )
+        except DuplicateKeyError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Vehicle with this registration number already exists"
+            )
+        except VersionConflictError:
+            raise HTTPException(
+                status_code=status.HTTP_412_PRECONDITION_FAILED,
+                detail="Vehicle has been modified"
+            )
+        
+        if not updated_vehicle:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Vehicle not found"
             )
         
-        # Check if updating registration number and it's already taken
-        if vehicle_data.VehRegNo and vehicle_data.VehRegNo != existing_vehicle.VehRegNo:
-            reg_check = await vehicle_service.get_vehicle_by_reg_no(vehicle_data.VehRegNo)
-            if reg_check:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Vehicle with this registration number already exists"
-                )
-        
-        # Update vehicle
-        updated_vehicle = await vehicle_service.update_vehicle(
-            vehicle_id=vehicle_id,
-            vehicle_data=vehicle_data,
-            updated_by=str(current_user.id)
-        )
-        
         # Prepare changes for logging
         changes = {}
         for field, value in vehicle_data.dict(exclude_unset=True).items():
@@ -210,6 +591,8 @@ async def update_vehicle(
             }
         )
         
+        response.headers["ETag"] = _etag(updated_vehicle.version)
+        
         return {
             "success": True,
             "message": "Vehicle updated successfully",
@@ -284,40 +667,37 @@ async def bulk_delete_vehicles(
     log_service = LogService()
     
     try:
-        deleted_count = 0
-        deleted_vehicles = []
+        outcomes, deleted = await vehicle_service.bulk_delete(
+            vehicle_ids=vehicle_ids,
+            deleted_by=str(current_user.id)
+        )
         
-        for vehicle_id in vehicle_ids:
-            # Check if vehicle exists
-            vehicle = await vehicle_service.get_vehicle_by_id(vehicle_id)
-            if vehicle:
-                # Soft delete vehicle
-                await vehicle_service.delete_vehicle(
-                    vehicle_id=vehicle_id,
-                    deleted_by=str(current_user.id)
-                )
-                deleted_count += 1
-                deleted_vehicles.append(vehicle.VehRegNo)
-                
-                # Log the deletion
-                await log_service.create_log(
-                    action="DELETE",
-                    entity_type="vehicle",
-                    entity_id=vehicle_id,
-                    user_id=str(current_user.id),
-                    user_name=current_user.fullName,
-                    details={
-                        "VehRegNo": vehicle.VehRegNo,
-                        "bulk_delete": True
-                    }
-                )
+        deleted_count = len(deleted)
+        deleted_vehicles = [vehicle["VehRegNo"] for vehicle in deleted]
+        
+        # Log the deletions in one batch
+        await log_service.create_logs([
+            {
+                "action": "DELETE",
+                "entity_type": "vehicle",
+                "entity_id": str(vehicle["_id"]),
+                "user_id": str(current_user.id),
+                "user_name": current_user.fullName,
+                "details": {
+                    "VehRegNo": vehicle["VehRegNo"],
+                    "bulk_delete": True
+                }
+            }
+            for vehicle in deleted
+        ])
         
         return {
             "success": True,
             "message": f"{deleted_count} vehicles deleted successfully",
             "data": {
                 "deleted_count": deleted_count,
-                "deleted_vehicles": deleted_vehicles
+                "deleted_vehicles": deleted_vehicles,
+                "results": outcomes
             }
         }
     except Exception as e:
@@ -0,0 +1,151 @@
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from pymongo import IndexModel, ASCENDING, DESCENDING
+from pymongo.errors import OperationFailure
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.database import get_database
+
+LOG_COLLECTION = "logs"
+PARTITION_NAME = re.compile(r"^logs_(\d{4})_(\d{2})$")
+
+# Partition names change at most once a month; don't list collections on every read
+_partition_names = TTLCache(max_size=1, ttl=60.0)
+_indexed_partitions = set()
+
+def log_indexes(ttl_seconds: Optional[int] = None) -> List[IndexModel]:
+    """Indexes every log collection carries; ttl_seconds makes the timestamp index a TTL index"""
+    timestamp_options = {"expireAfterSeconds": ttl_seconds} if ttl_seconds else {}
+    return [
+        IndexModel([("timestamp", DESCENDING)], name="timestamp", **timestamp_options),
+        # Trailing _id lets per-entity and per-user history pages use the (timestamp, _id) keyset sort
+        IndexModel(
+            [("entityType", ASCENDING), ("entityId", ASCENDING), ("timestamp", DESCENDING), ("_id", DESCENDING)],
+            name="entity_timestamp_id"
+        ),
+        IndexModel(
+            [("userId", ASCENDING), ("timestamp", DESCENDING), ("_id", DESCENDING)],
+            name="user_timestamp_id"
+        ),
+        IndexModel(
+            [("action", ASCENDING), ("timestamp", DESCENDING)],
+            name="action_timestamp"
+        )
+    ]
+
+def retention_seconds() -> Optional[int]:
+    return settings.LOG_RETENTION_DAYS * 86400 if settings.LOG_RETENTION_DAYS > 0 else None
+
+def partitioned() -> bool:
+    return settings.LOG_PARTITIONING == "monthly"
+
+def partition_name(timestamp: datetime) -> str:
+    return f"{LOG_COLLECTION}_{timestamp.year:04d}_{timestamp.month:02d}"
+
+def collection_for(timestamp: datetime) -> str:
+    """Collection a log written at timestamp belongs in"""
+    return partition_name(timestamp) if partitioned() else LOG_COLLECTION
+
+def _month_bounds(name: str) -> Tuple[datetime, datetime]:
+    year, month = (int(part) for part in PARTITION_NAME.match(name).groups())
+    start = datetime(year, month, 1)
+    end = datetime(year + 1, 1, 1) if month == 12 else datetime(year, month + 1, 1)
+    return start, end
+
+def naive_utc(value: Any) -> Any:
+    # Stored timestamps are naive UTC; router filters may carry an offset
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def timestamp_range(query: Dict[str, Any]) -> Tuple[Optional[datetime], Optional[datetime]]:
+    """Lower and upper timestamp bounds of a log query, where it has them"""
+    condition = query.get("timestamp")
+    if not isinstance(condition, dict):
+        return None, None
+    start = naive_utc(condition.get("$gte", condition.get("$gt")))
+    end = naive_utc(condition.get("$lte", condition.get("$lt")))
+    return start, end
+
+async def list_partitions() -> List[str]:
+    """Existing monthly partitions, newest first"""
+    names = _partition_names.get("names")
+    if names is None:
+        database = await get_database()
+        names = sorted(
+            (name for name in await database.list_collection_names() if PARTITION_NAME.match(name)),
+            reverse=True
+        )
+        _partition_names.set("names", names)
+    # Another worker may have opened this month's partition since the list was cached
+    current = partition_name(datetime.utcnow())
+    return names if current in names else [current] + names
+
+async def collections_for_query(query: Dict[str, Any]) -> List[str]:
+    """Log collections that can hold matches for query, newest data first"""
+    if not partitioned():
+        return [LOG_COLLECTION]
+
+    start, end = timestamp_range(query)
+    names = []
+    for name in await list_partitions():
+        month_start, month_end = _month_bounds(name)
+        if (start is None or month_end > start) and (end is None or month_start <= end):
+            names.append(name)
+
+    # Entries written before partitioning was enabled stay in the base collection
+    return names + [LOG_COLLECTION]
+
+async def ensure_partition(name: str) -> None:
+    """Create the log indexes on a partition the first time this process writes to it"""
+    if name == LOG_COLLECTION or name in _indexed_partitions:
+        return
+    database = await get_database()
+    await database[name].create_indexes(log_indexes())
+    _indexed_partitions.add(name)
+    _partition_names.clear()
+
+async def apply_retention() -> None:
+    """Bring the TTL on the base log collection in line with LOG_RETENTION_DAYS"""
+    ttl = retention_seconds()
+    database = await get_database()
+    if not ttl:
+        # A TTL left over from an earlier retention setting would keep deleting entries
+        collection = database[LOG_COLLECTION]
+        async for index in collection.list_indexes():
+            if index["name"] == "timestamp" and "expireAfterSeconds" in index:
+                print(
+                    f"LOG_RETENTION_DAYS is 0 but {LOG_COLLECTION}.timestamp still expires entries after "
+                    f"{index['expireAfterSeconds']}s; rebuilding it without a TTL"
+                )
+                await collection.drop_index("timestamp")
+                await collection.create_indexes(log_indexes()[:1])
+        return
+    try:
+        # Converts an existing plain timestamp index, or updates an older TTL
+        await database.command(
+            "collMod", LOG_COLLECTION,
+            index={"name": "timestamp", "expireAfterSeconds": ttl}
+        )
+    except OperationFailure as e:
+        print(f"Could not set log retention on {LOG_COLLECTION}: {e}")
+
+async def drop_expired_partitions(days_to_keep: Optional[int] = None) -> List[str]:
+    """Drop monthly partitions whose whole month is past the retention window"""
+    days_to_keep = settings.LOG_RETENTION_DAYS if days_to_keep is None else days_to_keep
+    if not partitioned() or days_to_keep <= 0:
+        return []
+
+    cutoff = datetime.utcnow() - timedelta(days=days_to_keep)
+    database = await get_database()
+    dropped = []
+    for name in await list_partitions():
+        if _month_bounds(name)[1] <= cutoff:
+            await database.drop_collection(name)
+            _indexed_partitions.discard(name)
+            dropped.append(name)
+
+    if dropped:
+        _partition_names.clear()
+    return dropped
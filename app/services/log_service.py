@@ -1,12 +1,59 @@
-from typing import List, Tuple, Dict, Any, Optional
-from datetime import datetime
+from typing import List, Tuple, Dict, Any, Optional, AsyncIterator
+from datetime import datetime, timedelta
 from bson import ObjectId
 from app.core.database import get_collection
 from app.models.log import LogCreate, LogInDB, LogAction
+from app.models.trusted import from_document
+from app.utils.pagination import count_documents, cursor_from_document, resume_filter
+from app.services.log_writer import log_writer
+from app.services.view_events import view_events
+from app.services.log_partitions import (
+    LOG_COLLECTION, log_indexes, retention_seconds, collections_for_query, drop_expired_partitions
+)
+from app.services.log_rollups import LogRollupService
+
+LOG_SORT = [("timestamp", -1), ("_id", -1)]
 
 class LogService:
+    indexes = log_indexes(retention_seconds())
+    # Superseded by entity_timestamp_id and user_timestamp_id
+    retired_indexes = ["entity_timestamp", "user_timestamp"]
+
     def __init__(self):
-        self.collection_name = "logs"
+        self.collection_name = LOG_COLLECTION
+
+    async def _find(self, query: Dict[str, Any], limit: int, skip: int = 0) -> List[Dict[str, Any]]:
+        """Newest-first matches across the log collections a query can touch"""
+        names = await collections_for_query(query)
+        documents = []
+        
+        for name in names:
+            collection = await get_collection(name, analytics=True)
+            if skip and len(names) > 1:
+                # Partitions cover disjoint months, so a partition can be skipped whole by count
+                skipped = await collection.count_documents(query, limit=skip)
+                if skipped < skip:
+                    skip -= skipped
+                    continue
+            
+            remaining = limit - len(documents)
+            cursor = collection.find(query).sort(LOG_SORT).skip(skip).limit(remaining)
+            documents.extend(await cursor.to_list(length=remaining))
+            skip = 0
+            if len(documents) >= limit:
+                break
+        
+        return documents
+
+    async def _count(self, query: Dict[str, Any], mode: str) -> Optional[int]:
+        """count_documents summed over the log collections a query can touch"""
+        if mode == "none":
+            return None
+        total = 0
+        for name in await collections_for_query(query):
+            collection = await get_collection(name, analytics=True)
+            total += await count_documents(collection, query, mode)
+        return total
 
     async def create_log(
         self,
@@ -19,9 +66,8 @@ class LogService:
         ip_address: Optional[str] = None
     ) -> LogInDB:
         """Create a new log entry"""
-        collection = await get_collection(self.collection_name)
-        
         log_data = {
+            "_id": ObjectId(),
             "action": action,
             "entityType": entity_type,
             "entityId": entity_id,
@@ -32,98 +78,170 @@ class LogService:
             "ipAddress": ip_address
         }
         
-        result = await collection.insert_one(log_data)
-        log_data["_id"] = result.inserted_id
+        # VIEW events go through the coalescing/sampling policy; writes stay exact
+        if action == LogAction.VIEW and view_events.enabled:
+            await view_events.record(dict(log_data))
+        # Hand off to the background writer when it is running
+        elif log_writer.running:
+            await log_writer.enqueue(dict(log_data))
+        else:
+            await log_writer.write([dict(log_data)])
         
         return LogInDB(**log_data)
 
+    async def create_logs(self, entries: List[Dict[str, Any]]) -> int:
+        """Create several log entries (create_log keyword arguments) in one write"""
+        if not entries:
+            return 0
+        
+        now = datetime.utcnow()
+        logs = [
+            {
+                "_id": ObjectId(),
+                "action": entry["action"],
+                "entityType": entry["entity_type"],
+                "entityId": entry["entity_id"],
+                "userId": entry["user_id"],
+                "userName": entry["user_name"],
+                "timestamp": now,
+                "details": entry.get("details") or {},
+                "ipAddress": entry.get("ip_address")
+            }
+            for entry in entries
+        ]
+        
+        if log_writer.running:
+            await log_writer.enqueue_many(logs)
+        else:
+            await log_writer.write(logs)
+        
+        return len(logs)
+
     async def get_logs_paginated(
         self,
         page: int = 1,
         limit: int = 20,
-        filters: Dict[str, Any] = None
-    ) -> Tuple[List[LogInDB], int]:
+        filters: Dict[str, Any] = None,
+        count: str = "exact"
+    ) -> Tuple[List[Any], Optional[int]]:
         """Get logs with pagination and filtering"""
-        collection = await get_collection(self.collection_name)
-        
         # Build query
         query = {}
         if filters:
             query.update(filters)
         
         # Count total documents
-        total_count = await collection.count_documents(query)
+        total_count = await self._count(query, count)
         
         # Calculate skip value
         skip = (page - 1) * limit
         
-        # Execute query with sorting by timestamp (newest first)
-        cursor = collection.find(query).sort("timestamp", -1).skip(skip).limit(limit)
-        logs = []
-        
-        async for document in cursor:
-            log = LogInDB(**document)
-            logs.append(log)
+        # Newest first, walking monthly partitions only as far as the page needs
+        documents = await self._find(query, limit, skip)
+        logs = [from_document(LogInDB, document) for document in documents]
         
         return logs, total_count
 
-    async def get_recent_logs(self, limit: int = 10) -> List[LogInDB]:
+    async def get_logs_by_cursor(
+        self,
+        limit: int = 20,
+        filters: Dict[str, Any] = None,
+        cursor: Optional[str] = None,
+        count: str = "none"
+    ) -> Tuple[List[Any], Optional[str], Optional[int]]:
+        """Get logs newest first, seeking past the (timestamp, _id) in cursor"""
+        query = dict(filters or {})
+        total_count = await self._count(query, count)
+        
+        if cursor:
+            seek = resume_filter(LOG_SORT, cursor)
+            query = {"$and": [query, seek]} if query else seek
+        
+        # Fetch one extra row to know whether another page exists
+        documents = await self._find(query, limit + 1)
+        
+        next_cursor = None
+        if len(documents) > limit:
+            documents = documents[:limit]
+            next_cursor = cursor_from_document(LOG_SORT, documents[-1])
+        
+        logs = [from_document(LogInDB, document) for document in documents]
+        return logs, next_cursor, total_count
+
+    async def iter_logs(
+        self,
+        filters: Dict[str, Any] = None,
+        batch_size: int = 1000
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream matching log documents newest first, one cursor per log collection"""
+        query = filters or {}
+        for name in await collections_for_query(query):
+            collection = await get_collection(name, analytics=True)
+            cursor = collection.find(query).sort(LOG_SORT).batch_size(batch_size)
+            async for document in cursor:
+                yield document
+
+    async def get_recent_logs(self, limit: int = 10) -> List[Any]:
         """Get recent log entries"""
-        collection = await get_collection(self.collection_name)
-        
-        cursor = collection.find().sort("timestamp", -1).limit(limit)
-        logs = []
-        
-        async for document in cursor:
-            log = LogInDB(**document)
-            logs.append(log)
-        
-        return logs
+        documents = await self._find({}, limit)
+        return [from_document(LogInDB, document) for document in documents]
 
-    async def get_logs_by_user(self, user_id: str, limit: int = 50) -> List[LogInDB]:
-        """Get logs for a specific user"""
-        collection = await get_collection(self.collection_name)
-        
-        cursor = collection.find({"userId": user_id}).sort("timestamp", -1).limit(limit)
-        logs = []
-        
-        async for document in cursor:
-            log = LogInDB(**document)
-            logs.append(log)
-        
-        return logs
+    async def get_logs_by_user(
+        self,
+        user_id: str,
+        limit: int = 50,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Any], Optional[str]]:
+        """Get logs for a specific user, newest first, continuing from cursor"""
+        logs, next_cursor, _ = await self.get_logs_by_cursor(
+            limit=limit,
+            filters={"userId": user_id},
+            cursor=cursor
+        )
+        return logs, next_cursor
 
     async def get_logs_by_entity(
         self, 
         entity_type: str, 
         entity_id: str, 
-        limit: int = 50
-    ) -> List[LogInDB]:
-        """Get logs for a specific entity"""
-        collection = await get_collection(self.collection_name)
-        
+        limit: int = 50,
+        cursor: Optional[str] = None
+    ) -> Tuple[List[Any], Optional[str]]:
+        """Get logs for a specific entity, newest first, continuing from cursor"""
         query = {
             "entityType": entity_type,
             "entityId": entity_id
         }
         
-        cursor = collection.find(query).sort("timestamp", -1).limit(limit)
-        logs = []
-        
-        async for document in cursor:
-            log = LogInDB(**document)
-            logs.append(log)
-        
-        return logs
+        logs, next_cursor, _ = await self.get_logs_by_cursor(
+            limit=limit,
+            filters=query,
+            cursor=cursor
+        )
+        return logs, next_cursor
 
     async def delete_old_logs(self, days_to_keep: int = 90) -> int:
-        """Delete logs older than specified days (for cleanup)"""
-        collection = await get_collection(self.collection_name)
+        """Delete logs older than specified days (for cleanup); expired monthly partitions are dropped whole"""
+        await drop_expired_partitions(days_to_keep)
         
         cutoff_date = datetime.utcnow() - timedelta(days=days_to_keep)
+        query = {"timestamp": {"$lt": cutoff_date}}
         
-        result = await collection.delete_many({
-            "timestamp": {"$lt": cutoff_date}
-        })
+        deleted = 0
+        for name in await collections_for_query(query):
+            collection = await get_collection(name)
+            result = await collection.delete_many(query)
+            deleted += result.deleted_count
         
-        return result.deleted_count
\ No newline at end of file
+        return deleted
+
+    async def get_activity_histogram(
+        self,
+        granularity: str = "hour",
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+        filters: Dict[str, Any] = None,
+        group_by: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Activity counts per hour or day, read from the rollups instead of raw logs"""
+        return await LogRollupService().get_histogram(granularity, start, end, filters, group_by)
\ No newline at end of file
@@ -0,0 +1,228 @@
+import asyncio
+import logging
+from typing import List, Dict, Any, Optional
+from pymongo.errors import AutoReconnect, BulkWriteError, NetworkTimeout, NotPrimaryError
+from app.core.config import settings
+from app.core.database import get_collection
+from app.services.log_partitions import collection_for, ensure_partition
+from app.services.log_rollups import LogRollupService
+
+logger = logging.getLogger(__name__)
+
+# Failovers and network blips; the same insert is expected to succeed once retried
+TRANSIENT_ERRORS = (AutoReconnect, NotPrimaryError, NetworkTimeout)
+DUPLICATE_KEY = 11000
+
+class AuditLogWriteError(Exception):
+    """Some entries of a batch could not be stored"""
+
+    def __init__(self, stored: int, unstored: List[Dict[str, Any]], transient: bool):
+        super().__init__(f"{len(unstored)} audit log entries could not be stored")
+        self.stored = stored
+        self.unstored = unstored
+        self.failed = len(unstored)
+        self.transient = transient
+
+class AuditLogWriter:
+    """Background writer that batches audit log inserts off the request path"""
+
+    def __init__(
+        self,
+        max_queue_size: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        full_policy: str = "block",
+        max_retries: int = 3,
+        retry_backoff: float = 0.5
+    ):
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.full_policy = full_policy
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._rollups = LogRollupService()
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.spilled = 0
+        self.failed = 0
+        self.retries = 0
+        self.flushes = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        """Start draining the queue"""
+        if self.running:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Flush everything still queued and stop the drain task"""
+        if not self.running:
+            return
+        await self._queue.put(None)
+        await self._task
+        self._task = None
+        self._queue = None
+
+    async def enqueue(self, log_data: Dict[str, Any]):
+        """Queue a log document, applying the queue-full policy"""
+        if not self.running:
+            await self._insert([log_data])
+            return
+
+        try:
+            self._queue.put_nowait(log_data)
+            self.enqueued += 1
+            return
+        except asyncio.QueueFull:
+            pass
+
+        if self.full_policy == "drop":
+            self.dropped += 1
+        elif self.full_policy == "inline":
+            self.spilled += 1
+            await self._insert([log_data])
+        else:
+            await self._queue.put(log_data)
+            self.enqueued += 1
+
+    async def enqueue_many(self, logs: List[Dict[str, Any]]):
+        """Queue several log documents"""
+        if not self.running:
+            await self._insert(logs)
+            return
+        for log_data in logs:
+            await self.enqueue(log_data)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                break
+
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+
+            # Collect until the batch is full or the flush interval elapses
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._insert(batch)
+            self.flushes += 1
+
+    async def write(self, batch: List[Dict[str, Any]]) -> int:
+        """Insert log documents now, bypassing the queue, and count the stored ones into the rollups"""
+        # With monthly partitioning a batch spanning midnight on the 1st splits in two
+        partitions: Dict[str, List[Dict[str, Any]]] = {}
+        for log_data in batch:
+            partitions.setdefault(collection_for(log_data["timestamp"]), []).append(log_data)
+
+        stored = []
+        unstored = []
+        error = None
+        transient = False
+        for name, entries in partitions.items():
+            try:
+                await ensure_partition(name)
+                collection = await get_collection(name)
+                await collection.insert_many(entries, ordered=False)
+                stored.extend(entries)
+            except BulkWriteError as e:
+                # Unordered inserts keep going past a bad document; only the reported ones are missing.
+                # A duplicate _id means an earlier, interrupted attempt already stored the entry
+                failed = {
+                    write_error["index"] for write_error in e.details.get("writeErrors", [])
+                    if write_error.get("code") != DUPLICATE_KEY
+                }
+                for index, entry in enumerate(entries):
+                    (unstored if index in failed else stored).append(entry)
+                if failed:
+                    error = e
+            except Exception as e:
+                unstored.extend(entries)
+                error = e
+                transient = transient or isinstance(e, TRANSIENT_ERRORS)
+
+        # The entries are stored; a failed rollup update only skews the histograms
+        if stored:
+            try:
+                await self._rollups.record(stored)
+            except Exception as e:
+                print(f"Audit rollup update failed for {len(stored)} entries: {e}")
+
+        if error is not None:
+            raise AuditLogWriteError(len(stored), unstored, transient) from error
+        return len(stored)
+
+    async def _insert(self, batch: List[Dict[str, Any]]):
+        pending = batch
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.written += await self.write(pending)
+                return
+            except AuditLogWriteError as e:
+                self.written += e.stored
+                pending = e.unstored
+                error = e.__cause__
+                if not e.transient:
+                    break
+            except Exception as e:
+                error = e
+                break
+            
+            if attempt < self.max_retries:
+                # Only the entries that did not make it are retried; _ids are fixed, so none is stored twice
+                self.retries += 1
+                await asyncio.sleep(self.retry_backoff * 2 ** attempt)
+        
+        self.failed += len(pending)
+        logger.error(
+            "Audit log write lost %d of %d entries: %s",
+            len(pending), len(batch), error
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and write counters"""
+        return {
+            "running": self.running,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "maxQueueSize": self.max_queue_size,
+            "fullPolicy": self.full_policy,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "spilled": self.spilled,
+            "failed": self.failed,
+            "retries": self.retries,
+            "flushes": self.flushes
+        }
+
+log_writer = AuditLogWriter(
+    max_queue_size=settings.AUDIT_LOG_QUEUE_SIZE,
+    batch_size=settings.AUDIT_LOG_BATCH_SIZE,
+    flush_interval=settings.AUDIT_LOG_FLUSH_INTERVAL_SECONDS,
+    full_policy=settings.AUDIT_LOG_QUEUE_FULL_POLICY,
+    max_retries=settings.AUDIT_LOG_WRITE_RETRIES,
+    retry_backoff=settings.AUDIT_LOG_RETRY_BACKOFF_SECONDS
+)
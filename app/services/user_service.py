@@ -1,16 +1,49 @@
-from typing import Optional
+from typing import Optional, Dict, Any
 from datetime import datetime
 from bson import ObjectId
+from pymongo import IndexModel, ASCENDING, ReturnDocument
+from app.core.cache import TTLCache
+from app.core.config import settings
 from app.core.database import get_collection
-from app.core.security import get_password_hash, verify_password
+from app.core.security import get_password_hash_async, verify_password_async
 from app.models.user import UserCreate, UserUpdate, UserInDB
 
+# Active users keyed by id, shared by every request in this process
+user_cache = TTLCache(
+    max_size=settings.USER_CACHE_MAX_SIZE,
+    ttl=settings.USER_CACHE_TTL_SECONDS
+)
+
 class UserService:
+    indexes = [
+        IndexModel(
+            [("username", ASCENDING)],
+            name="uniq_active_username",
+            unique=True,
+            partialFilterExpression={"IsActive": True}
+        ),
+        IndexModel(
+            [("email", ASCENDING)],
+            name="uniq_active_email",
+            unique=True,
+            partialFilterExpression={"IsActive": True}
+        )
+    ]
+
     def __init__(self):
         self.collection_name = "users"
 
+    @staticmethod
+    def cache_stats() -> Dict[str, Any]:
+        """Get hit/miss counters of the authenticated-user cache"""
+        return user_cache.stats()
+
     async def get_user_by_id(self, user_id: str) -> Optional[UserInDB]:
         """Get a user by ID"""
+        cached_user = user_cache.get(user_id)
+        if cached_user is not None:
+            return cached_user
+        
         collection = await get_collection(self.collection_name)
         
         try:
@@ -20,7 +53,9 @@ class UserService:
             })
             
             if document:
-                return UserInDB(**document)
+                user = UserInDB(**document)
+                user_cache.set(user_id, user)
+                return user
             return None
         except Exception:
             return None
@@ -59,7 +94,7 @@ class UserService:
         
         user_dict = user_data.dict()
         user_dict.update({
-            "password": get_password_hash(user_data.password),
+            "password": await get_password_hash_async(user_data.password),
             "IsActive": True,
             "CreatedAt": now,
             "UpdatedAt": now
@@ -77,7 +112,7 @@ class UserService:
         if not user:
             return None
         
-        if not verify_password(password, user.password):
+        if not await verify_password_async(password, user.password):
             return None
         
         return user
@@ -98,12 +133,17 @@ class UserService:
             "UpdatedAt": datetime.utcnow()
         })
         
-        await collection.update_one(
+        # Return the updated document from the write itself instead of re-reading it
+        document = await collection.find_one_and_update(
             {"_id": ObjectId(user_id), "IsActive": True},
-            {"$set": update_dict}
+            {"$set": update_dict},
+            return_document=ReturnDocument.AFTER
         )
+        user_cache.invalidate(user_id)
         
-        return await self.get_user_by_id(user_id)
+        if not document:
+            return None
+        return UserInDB(**document)
 
     async def deactivate_user(self, user_id: str) -> bool:
         """Deactivate a user (soft delete)"""
@@ -118,5 +158,6 @@ class UserService:
                 }
             }
         )
+        user_cache.invalidate(user_id)
         
         return result.modified_count > 0
\ No newline at end of file
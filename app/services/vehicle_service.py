@@ -1,59 +1,282 @@
-from typing import Optional, List, Tuple, Dict, Any
+import re
+from typing import Optional, List, Tuple, Dict, Any, AsyncIterator
 from datetime import datetime
 from bson import ObjectId
+from pydantic import ValidationError
+from pymongo import IndexModel, ASCENDING, DESCENDING, TEXT, ReturnDocument
+from pymongo.errors import BulkWriteError
+from app.core.cache import TTLCache
+from app.core.config import settings
 from app.core.database import get_collection
-from app.models.vehicle import VehicleCreate, VehicleUpdate, VehicleInDB
+from app.models.vehicle import (
+    VehicleCreate, VehicleUpdate, VehicleInDB, VehicleSummary, VEHICLE_SUMMARY_FIELDS,
+    VEHICLE_CURSOR_SORT_FIELDS
+)
+from app.models.trusted import from_document, trusted_row
+from app.utils.pagination import count_documents, cursor_from_document, resume_filter
+
+ACTIVE_ONLY = {"isDeleted": False}
+FLEET_STATS_ID = "fleet"
+SEARCH_FIELDS = ["VehRegNo", "MakeType", "Model", "PresentUnitName"]
+TEXT_SCORE = {"$meta": "textScore"}
+
+# Rendered GET /vehicles list responses, keyed with the generation they were read at
+list_cache = TTLCache(
+    max_size=settings.VEHICLE_LIST_CACHE_MAX_SIZE,
+    ttl=settings.VEHICLE_LIST_CACHE_TTL_SECONDS,
+    sizeof=len
+)
+_list_generation = 0
+
+def _enum_value(value: Any) -> Any:
+    return getattr(value, "value", value)
+
+def _version_clause(version: int) -> Dict[str, Any]:
+    # Documents written before versioning have no version field and count as 0
+    return {"version": {"$in": [0, None]}} if version == 0 else {"version": version}
+
+def _format_validation_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}"
+        for item in error.errors()
+    )
+
+class VersionConflictError(Exception):
+    """The vehicle exists but no longer has the version the caller expected"""
 
 class VehicleService:
+    indexes = [
+        IndexModel(
+            [("VehRegNo", ASCENDING)],
+            name="uniq_active_reg_no",
+            unique=True,
+            partialFilterExpression=ACTIVE_ONLY
+        ),
+        IndexModel(
+            [("isDeleted", ASCENDING), ("CreatedAt", DESCENDING)],
+            name="deleted_created_at"
+        ),
+        IndexModel(
+            [("status", ASCENDING), ("CreatedAt", DESCENDING)],
+            name="active_status_created_at",
+            partialFilterExpression=ACTIVE_ONLY
+        ),
+        IndexModel(
+            [("vehicle_type", ASCENDING), ("CreatedAt", DESCENDING)],
+            name="active_type_created_at",
+            partialFilterExpression=ACTIVE_ONLY
+        ),
+        IndexModel(
+            [("fuel_type", ASCENDING), ("CreatedAt", DESCENDING)],
+            name="active_fuel_created_at",
+            partialFilterExpression=ACTIVE_ONLY
+        ),
+        IndexModel(
+            [(field, TEXT) for field in SEARCH_FIELDS],
+            name="vehicle_search_text",
+            weights={"VehRegNo": 10, "MakeType": 3, "Model": 3, "PresentUnitName": 1},
+            default_language="none"
+        )
+    ]
+    # Create and update rely on this index to reject duplicate registration numbers
+    required_indexes = ["uniq_active_reg_no"]
+
     def __init__(self):
         self.collection_name = "vehicles"
+        self.stats_collection_name = "fleet_stats"
+
+    @staticmethod
+    def list_cache_generation() -> int:
+        """Counter bumped by every vehicle write; part of each list cache key"""
+        return _list_generation
+
+    @staticmethod
+    def _invalidate_lists() -> None:
+        # Entries under older generations are never hit again and age out of the LRU
+        global _list_generation
+        _list_generation += 1
+
+    @staticmethod
+    def cache_stats() -> Dict[str, Any]:
+        """Get hit/miss counters and memory use of the list response cache"""
+        return {**list_cache.stats(), "generation": _list_generation}
+
+    def _build_query(self, filters: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Build the vehicle list query from router filters"""
+        query = {"isDeleted": False}
+        
+        if filters:
+            if filters.get("search"):
+                query.update(self._search_clause(
+                    filters["search"],
+                    filters.get("search_mode") or "regex"
+                ))
+            
+            for key, value in filters.items():
+                if key not in ("search", "search_mode") and value:
+                    query[key] = value
+        
+        return query
+
+    @staticmethod
+    def _search_clause(search_term: str, search_mode: str) -> Dict[str, Any]:
+        """Translate a search term into an indexable query clause"""
+        if search_mode == "prefix":
+            # Anchored, case-sensitive prefix so the VehRegNo index bounds the scan. VehRegNo is
+            # stored as submitted, so the term must match its case; regex mode ignores case
+            return {"VehRegNo": {"$regex": "^" + re.escape(search_term.strip())}}
+        
+        if search_mode == "text":
+            # Whole-token matches only; opt-in because partial input stops matching
+            return {"$text": {"$search": search_term}}
+        
+        # Default: case-insensitive substring, so as-you-type searches keep matching
+        return {"$or": [
+            {field: {"$regex": re.escape(search_term), "$options": "i"}}
+            for field in SEARCH_FIELDS
+        ]}
+
+    async def _count(self, collection, query: Dict[str, Any], mode: str) -> Optional[int]:
+        """Count list matches; estimated reads the fleet counters when nothing is filtered"""
+        if mode == "estimated" and query == {"isDeleted": False}:
+            stats_collection = await get_collection(self.stats_collection_name, analytics=True)
+            document = await stats_collection.find_one({"_id": FLEET_STATS_ID}, {"total": 1})
+            if document:
+                return document.get("total", 0)
+        # Filtered lists (and lists before the first reconciliation) are counted exactly
+        return await count_documents(collection, query, mode)
+
+    @staticmethod
+    def _is_ranked(filters: Dict[str, Any] = None, sorting: Dict[str, int] = None) -> bool:
+        """Text searches without an explicit sort are ordered by relevance"""
+        return bool(
+            filters
+            and filters.get("search")
+            and (filters.get("search_mode") or "regex") == "text"
+            and not sorting
+        )
+
+    @staticmethod
+    def _list_projection(view: str = "full", fields: List[str] = None) -> Optional[Dict[str, Any]]:
+        """Mongo projection for a list view or an explicit field selection"""
+        if fields is not None:
+            return {field: 1 for field in fields} or {"_id": 1}
+        if view == "summary":
+            return {field: 1 for field in VEHICLE_SUMMARY_FIELDS}
+        return None
+
+    @staticmethod
+    def _list_item(document: Dict[str, Any], view: str = "full", fields: List[str] = None) -> Any:
+        """Shape a projected document for a list response"""
+        if fields is not None:
+            return trusted_row(document, fields)
+        if view == "summary":
+            return from_document(VehicleSummary, document)
+        return from_document(VehicleInDB, document)
 
     async def get_vehicles_paginated(
         self, 
         page: int = 1, 
         limit: int = 10, 
         filters: Dict[str, Any] = None,
-        sorting: Dict[str, int] = None
-    ) -> Tuple[List[VehicleInDB], int]:
+        sorting: Dict[str, int] = None,
+        count: str = "exact",
+        view: str = "full",
+        fields: List[str] = None
+    ) -> Tuple[List[Any], Optional[int]]:
         """Get vehicles with pagination and filtering"""
         collection = await get_collection(self.collection_name)
         
         # Build query
-        query = {"isDeleted": False}
-        
-        if filters:
-            if "search" in filters:
-                search_term = filters["search"]
-                query["$or"] = [
-                    {"VehRegNo": {"$regex": search_term, "$options": "i"}},
-                    {"MakeType": {"$regex": search_term, "$options": "i"}},
-                    {"Model": {"$regex": search_term, "$options": "i"}},
-                    {"PresentUnitName": {"$regex": search_term, "$options": "i"}}
-                ]
-            
-            for key, value in filters.items():
-                if key != "search" and value:
-                    query[key] = value
+        query = self._build_query(filters)
         
         # Count total documents
-        total_count = await collection.count_documents(query)
+        total_count = await self._count(collection, query, count)
         
         # Calculate skip value
         skip = (page - 1) * limit
         
         # Build sort criteria
-        sort_criteria = sorting if sorting else {"CreatedAt": -1}
+        projection = self._list_projection(view, fields)
+        if self._is_ranked(filters, sorting):
+            projection = {**(projection or {}), "score": TEXT_SCORE}
+            sort_criteria = {"score": TEXT_SCORE}
+        else:
+            sort_criteria = sorting if sorting else {"CreatedAt": -1}
         
         # Execute query
-        cursor = collection.find(query).sort(list(sort_criteria.items())).skip(skip).limit(limit)
+        cursor = collection.find(query, projection).sort(list(sort_criteria.items())).skip(skip).limit(limit)
         vehicles = []
         
         async for document in cursor:
-            vehicle = VehicleInDB(**document)
+            vehicle = self._list_item(document, view, fields)
             vehicles.append(vehicle)
         
         return vehicles, total_count
 
+    async def get_vehicles_by_cursor(
+        self,
+        limit: int = 10,
+        filters: Dict[str, Any] = None,
+        sorting: Dict[str, int] = None,
+        cursor: Optional[str] = None,
+        count: str = "none",
+        view: str = "full",
+        fields: List[str] = None
+    ) -> Tuple[List[Any], Optional[str], Optional[int]]:
+        """Get vehicles by seeking past the (sort key, _id) position in cursor"""
+        collection = await get_collection(self.collection_name)
+        
+        unsupported = [field for field in (sorting or {}) if field not in VEHICLE_CURSOR_SORT_FIELDS]
+        if unsupported:
+            raise ValueError(
+                f"Cursor pagination cannot sort by {', '.join(unsupported)}; "
+                f"use one of {', '.join(VEHICLE_CURSOR_SORT_FIELDS)}"
+            )
+        
+        query = self._build_query(filters)
+        total_count = await self._count(collection, query, count)
+        
+        # Relevance scores cannot be seeked on, so cursor mode keeps the key order.
+        # _id breaks ties so the order is total and seeks are stable
+        sort_criteria = list((sorting or {"CreatedAt": -1}).items())
+        sort_spec = sort_criteria + [("_id", sort_criteria[-1][1])]
+        
+        if cursor:
+            query = {"$and": [query, resume_filter(sort_spec, cursor)]}
+        
+        # Sort keys are always projected so the next cursor can be built
+        projection = self._list_projection(view, fields)
+        if projection is not None:
+            projection.update({field: 1 for field, _ in sort_spec})
+        
+        # Fetch one extra row to know whether another page exists
+        documents = await collection.find(query, projection).sort(sort_spec).limit(limit + 1).to_list(length=limit + 1)
+        
+        next_cursor = None
+        if len(documents) > limit:
+            documents = documents[:limit]
+            next_cursor = cursor_from_document(sort_spec, documents[-1])
+        
+        vehicles = [self._list_item(document, view, fields) for document in documents]
+        return vehicles, next_cursor, total_count
+
+    async def iter_vehicles(
+        self,
+        filters: Dict[str, Any] = None,
+        sorting: Dict[str, int] = None,
+        batch_size: int = 1000
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream matching vehicle documents from a single cursor"""
+        collection = await get_collection(self.collection_name, analytics=True)
+        
+        query = self._build_query(filters)
+        sort_criteria = sorting if sorting else {"CreatedAt": -1}
+        
+        cursor = collection.find(query).sort(list(sort_criteria.items())).batch_size(batch_size)
+        async for document in cursor:
+            yield document
+
     async def get_vehicle_by_id(self, vehicle_id: str) -> Optional[VehicleInDB]:
         """Get a vehicle by ID"""
         collection = await get_collection(self.collection_name)
@@ -96,44 +319,81 @@ class VehicleService:
             "UpdatedBy": created_by,
             "UpdatedAt": now,
             "IsActive": True,
-            "isDeleted": False
+            "isDeleted": False,
+            "version": 1
         })
         
         result = await collection.insert_one(vehicle_dict)
         vehicle_dict["_id"] = result.inserted_id
         
+        await self._adjust_fleet_stats(
+            total=1,
+            by_status={vehicle_dict["status"]: 1},
+            by_type={vehicle_dict["vehicle_type"]: 1}
+        )
+        self._invalidate_lists()
+        
         return VehicleInDB(**vehicle_dict)
 
     async def update_vehicle(
         self, 
         vehicle_id: str, 
         vehicle_data: VehicleUpdate, 
-        updated_by: str
+        updated_by: str,
+        expected_version: Optional[int] = None
     ) -> Optional[VehicleInDB]:
-        """Update a vehicle"""
+        """Update a vehicle, optionally only if it is still at expected_version"""
         collection = await get_collection(self.collection_name)
         
+        if not ObjectId.is_valid(vehicle_id):
+            return None
+        
         update_dict = vehicle_data.dict(exclude_unset=True)
         if not update_dict:
-            return await self.get_vehicle_by_id(vehicle_id)
+            vehicle = await self.get_vehicle_by_id(vehicle_id)
+            if vehicle and expected_version is not None and vehicle.version != expected_version:
+                raise VersionConflictError(vehicle_id)
+            return vehicle
         
         update_dict.update({
             "UpdatedBy": updated_by,
             "UpdatedAt": datetime.utcnow()
         })
         
-        await collection.update_one(
-            {"_id": ObjectId(vehicle_id), "isDeleted": False},
-            {"$set": update_dict}
+        query = {"_id": ObjectId(vehicle_id), "isDeleted": False}
+        if expected_version is not None:
+            query.update(_version_clause(expected_version))
+        
+        # One round trip: the previous document gives both the counter moves and,
+        # with the $set applied locally, the updated vehicle. A VehRegNo clash
+        # raises DuplicateKeyError from the unique index.
+        before = await collection.find_one_and_update(
+            query,
+            {"$set": update_dict, "$inc": {"version": 1}},
+            return_document=ReturnDocument.BEFORE
         )
+        if not before:
+            # Only a failed conditional write pays for telling 404 from 412
+            if expected_version is not None and await collection.count_documents(
+                {"_id": ObjectId(vehicle_id), "isDeleted": False}, limit=1
+            ):
+                raise VersionConflictError(vehicle_id)
+            return None
+        self._invalidate_lists()
+        
+        if "status" in update_dict or "vehicle_type" in update_dict:
+            await self._adjust_fleet_stats(
+                by_status=self._moved(before.get("status"), update_dict.get("status")),
+                by_type=self._moved(before.get("vehicle_type"), update_dict.get("vehicle_type"))
+            )
         
-        return await self.get_vehicle_by_id(vehicle_id)
+        return VehicleInDB(**{**before, **update_dict, "version": before.get("version", 0) + 1})
 
     async def delete_vehicle(self, vehicle_id: str, deleted_by: str) -> bool:
         """Soft delete a vehicle"""
         collection = await get_collection(self.collection_name)
         
-        result = await collection.update_one(
+        before = await collection.find_one_and_update(
             {"_id": ObjectId(vehicle_id), "isDeleted": False},
             {
                 "$set": {
@@ -141,23 +401,248 @@ class VehicleService:
                     "UpdatedBy": deleted_by,
                     "UpdatedAt": datetime.utcnow()
                 }
-            }
+            },
+            projection={"status": 1, "vehicle_type": 1},
+            return_document=ReturnDocument.BEFORE
+        )
+        
+        if not before:
+            return False
+        self._invalidate_lists()
+        
+        await self._adjust_fleet_stats(
+            total=-1,
+            by_status={before.get("status"): -1},
+            by_type={before.get("vehicle_type"): -1}
+        )
+        return True
+
+    async def import_vehicles_batch(
+        self,
+        rows: List[Tuple[int, Dict[str, Any]]],
+        created_by: str
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Validate and insert one chunk of (row number, raw row) pairs; returns inserted docs and row errors"""
+        collection = await get_collection(self.collection_name)
+        
+        errors = []
+        candidates = []
+        seen_reg_nos = set()
+        
+        for row_number, raw in rows:
+            try:
+                # CSV leaves missing optional columns as empty strings
+                vehicle_data = VehicleCreate(**{
+                    key: value for key, value in raw.items() if value not in ("", None)
+                })
+            except ValidationError as e:
+                errors.append({"row": row_number, "error": _format_validation_error(e)})
+                continue
+            except TypeError as e:
+                # e.g. non-string keys; one malformed row must not abort a partly committed import
+                errors.append({"row": row_number, "error": str(e)})
+                continue
+            
+            if vehicle_data.VehRegNo in seen_reg_nos:
+                errors.append({"row": row_number, "error": "Duplicate VehRegNo in file"})
+                continue
+            seen_reg_nos.add(vehicle_data.VehRegNo)
+            candidates.append((row_number, vehicle_data))
+        
+        # One lookup for registration numbers that already exist
+        existing = set()
+        if seen_reg_nos:
+            async for document in collection.find(
+                {"VehRegNo": {"$in": list(seen_reg_nos)}, "isDeleted": False},
+                {"VehRegNo": 1}
+            ):
+                existing.add(document["VehRegNo"])
+        
+        now = datetime.utcnow()
+        documents = []
+        row_numbers = []
+        for row_number, vehicle_data in candidates:
+            if vehicle_data.VehRegNo in existing:
+                errors.append({"row": row_number, "error": "Vehicle with this registration number already exists"})
+                continue
+            
+            vehicle_dict = vehicle_data.dict()
+            vehicle_dict.update({
+                "_id": ObjectId(),
+                "CreatedBy": created_by,
+                "CreatedAt": now,
+                "UpdatedBy": created_by,
+                "UpdatedAt": now,
+                "IsActive": True,
+                "isDeleted": False,
+                "version": 1
+            })
+            documents.append(vehicle_dict)
+            row_numbers.append(row_number)
+        
+        if not documents:
+            return [], errors
+        
+        failed = set()
+        try:
+            await collection.insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            # Rows duplicated in an earlier chunk are caught by the unique index
+            for write_error in e.details.get("writeErrors", []):
+                failed.add(write_error["index"])
+                message = (
+                    "Vehicle with this registration number already exists"
+                    if write_error.get("code") == 11000 else write_error.get("errmsg", "Insert failed")
+                )
+                errors.append({"row": row_numbers[write_error["index"]], "error": message})
+        
+        inserted = [document for index, document in enumerate(documents) if index not in failed]
+        
+        by_status, by_type = {}, {}
+        for document in inserted:
+            status_key, type_key = _enum_value(document["status"]), _enum_value(document["vehicle_type"])
+            by_status[status_key] = by_status.get(status_key, 0) + 1
+            by_type[type_key] = by_type.get(type_key, 0) + 1
+        await self._adjust_fleet_stats(total=len(inserted), by_status=by_status, by_type=by_type)
+        if inserted:
+            self._invalidate_lists()
+        
+        errors.sort(key=lambda error: error["row"])
+        return inserted, errors
+
+    async def bulk_delete(
+        self,
+        vehicle_ids: List[str],
+        deleted_by: str
+    ) -> Tuple[Dict[str, str], List[Dict[str, Any]]]:
+        """Soft delete many vehicles; returns per-id outcomes and the deleted documents"""
+        collection = await get_collection(self.collection_name)
+        
+        outcomes = {}
+        object_ids = []
+        for vehicle_id in vehicle_ids:
+            if ObjectId.is_valid(vehicle_id):
+                object_ids.append(ObjectId(vehicle_id))
+            else:
+                outcomes[vehicle_id] = "invalid_id"
+        
+        found = await collection.find(
+            {"_id": {"$in": object_ids}, "isDeleted": False},
+            {"VehRegNo": 1, "MakeType": 1, "Model": 1, "status": 1, "vehicle_type": 1}
+        ).to_list(length=None)
+        
+        if found:
+            # Millisecond precision so the value round-trips through BSON for the re-read below
+            now = datetime.utcnow()
+            now = now.replace(microsecond=now.microsecond // 1000 * 1000)
+            candidate_ids = [document["_id"] for document in found]
+            result = await collection.update_many(
+                {"_id": {"$in": candidate_ids}, "isDeleted": False},
+                {
+                    "$set": {
+                        "isDeleted": True,
+                        "UpdatedBy": deleted_by,
+                        "UpdatedAt": now
+                    }
+                }
+            )
+            
+            if result.modified_count != len(found):
+                # Another request deleted some of these in between; keep only the ones this call deleted
+                deleted_ids = {
+                    document["_id"]
+                    async for document in collection.find(
+                        {"_id": {"$in": candidate_ids}, "isDeleted": True, "UpdatedBy": deleted_by, "UpdatedAt": now},
+                        {"_id": 1}
+                    )
+                }
+                found = [document for document in found if document["_id"] in deleted_ids]
+        
+        if found:
+            by_status, by_type = {}, {}
+            for document in found:
+                by_status[document.get("status")] = by_status.get(document.get("status"), 0) - 1
+                by_type[document.get("vehicle_type")] = by_type.get(document.get("vehicle_type"), 0) - 1
+            await self._adjust_fleet_stats(total=-len(found), by_status=by_status, by_type=by_type)
+            self._invalidate_lists()
+        
+        found_ids = {str(document["_id"]) for document in found}
+        for vehicle_id in vehicle_ids:
+            if vehicle_id not in outcomes:
+                outcomes[vehicle_id] = "deleted" if vehicle_id in found_ids else "not_found"
+        
+        return outcomes, found
+
+    @staticmethod
+    def _moved(old: Any, new: Any) -> Dict[Any, int]:
+        """Counter deltas for a value changing from old to new"""
+        old, new = _enum_value(old), _enum_value(new)
+        if new is None or old == new:
+            return {}
+        return {old: -1, new: 1}
+
+    async def _adjust_fleet_stats(
+        self,
+        total: int = 0,
+        by_status: Dict[Any, int] = None,
+        by_type: Dict[Any, int] = None
+    ):
+        """Apply incremental changes to the materialized fleet counters"""
+        increments = {}
+        if total:
+            increments["total"] = total
+        for prefix, deltas in (("byStatus", by_status), ("byType", by_type)):
+            for key, delta in (deltas or {}).items():
+                if key is not None and delta:
+                    increments[f"{prefix}.{_enum_value(key)}"] = delta
+        
+        if not increments:
+            return
+        
+        # No upsert: until the first reconciliation the dashboard aggregates instead
+        stats_collection = await get_collection(self.stats_collection_name)
+        await stats_collection.update_one({"_id": FLEET_STATS_ID}, {"$inc": increments})
+
+    async def get_fleet_stats(self) -> Dict[str, Any]:
+        """Get the materialized fleet counters, aggregating if they do not exist yet"""
+        stats_collection = await get_collection(self.stats_collection_name, analytics=True)
+        document = await stats_collection.find_one({"_id": FLEET_STATS_ID})
+        
+        if not document:
+            return await self.get_fleet_summary()
+        
+        return {
+            "total": document.get("total", 0),
+            "byStatus": {key: count for key, count in document.get("byStatus", {}).items() if count},
+            "byType": {key: count for key, count in document.get("byType", {}).items() if count}
+        }
+
+    async def reconcile_fleet_stats(self) -> Dict[str, Any]:
+        """Rebuild the materialized fleet counters from a full aggregation"""
+        # Read from the primary so the rebuilt counters are not behind the increments
+        summary = await self.get_fleet_summary(analytics=False)
+        
+        stats_collection = await get_collection(self.stats_collection_name)
+        await stats_collection.replace_one(
+            {"_id": FLEET_STATS_ID},
+            {**summary, "reconciledAt": datetime.utcnow()},
+            upsert=True
         )
         
-        return result.modified_count > 0
+        return summary
 
     async def get_total_vehicles(self) -> int:
         """Get total count of active vehicles"""
-        collection = await get_collection(self.collection_name)
+        collection = await get_collection(self.collection_name, analytics=True)
         return await collection.count_documents({"isDeleted": False})
 
     async def get_vehicles_by_status(self) -> Dict[str, int]:
         """Get vehicle count grouped by status"""
-        collection = await get_collection(self.collection_name)
+        collection = await get_collection(self.collection_name, analytics=True)
         
         pipeline = [
             {"$match": {"isDeleted": False}},
-            {"$group": {"_id": "$Status", "count": {"$sum": 1}}}
+            {"$group": {"_id": "$status", "count": {"$sum": 1}}}
         ]
         
         cursor = collection.aggregate(pipeline)
@@ -170,11 +655,11 @@ class VehicleService:
 
     async def get_vehicles_by_type(self) -> Dict[str, int]:
         """Get vehicle count grouped by type"""
-        collection = await get_collection(self.collection_name)
+        collection = await get_collection(self.collection_name, analytics=True)
         
         pipeline = [
             {"$match": {"isDeleted": False}},
-            {"$group": {"_id": "$VehicleType", "count": {"$sum": 1}}}
+            {"$group": {"_id": "$vehicle_type", "count": {"$sum": 1}}}
         ]
         
         cursor = collection.aggregate(pipeline)
@@ -183,4 +668,27 @@ class VehicleService:
         async for doc in cursor:
             type_counts[doc["_id"]] = doc["count"]
         
-        return type_counts
\ No newline at end of file
+        return type_counts
+
+    async def get_fleet_summary(self, analytics: bool = True) -> Dict[str, Any]:
+        """Get total, by-status and by-type counts in a single aggregation pass"""
+        collection = await get_collection(self.collection_name, analytics=analytics)
+        
+        pipeline = [
+            {"$match": {"isDeleted": False}},
+            {"$facet": {
+                "total": [{"$count": "count"}],
+                "byStatus": [{"$group": {"_id": "$status", "count": {"$sum": 1}}}],
+                "byType": [{"$group": {"_id": "$vehicle_type", "count": {"$sum": 1}}}]
+            }}
+        ]
+        
+        result = await collection.aggregate(pipeline).to_list(length=1)
+        facets = result[0] if result else {}
+        
+        total = facets.get("total") or [{"count": 0}]
+        return {
+            "total": total[0]["count"],
+            "byStatus": {doc["_id"]: doc["count"] for doc in facets.get("byStatus", [])},
+            "byType": {doc["_id"]: doc["count"] for doc in facets.get("byType", [])}
+        }
\ No newline at end of file
@@ -0,0 +1,101 @@
+import random
+import time
+from typing import Any, Dict, Hashable, List
+from app.core.config import settings
+from app.services.log_writer import log_writer
+
+class ViewEventPolicy:
+    """Coalesces VIEW audit events per (user, entity) over a window, with optional sampling"""
+
+    def __init__(
+        self,
+        window: float = 60.0,
+        sample_rate: float = 1.0,
+        max_pending: int = 10000
+    ):
+        self.window = window
+        self.sample_rate = sample_rate
+        self.max_pending = max_pending
+        self._pending: Dict[Hashable, Dict[str, Any]] = {}
+        self._window_started = time.monotonic()
+        self.started = False
+        self.received = 0
+        self.sampled_out = 0
+        self.coalesced = 0
+        self.emitted = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.window > 0 or self.sample_rate < 1
+
+    def start(self):
+        """Begin coalescing; the caller must flush periodically and call stop on shutdown"""
+        self.started = True
+        self._window_started = time.monotonic()
+
+    async def stop(self):
+        """Stop coalescing and write whatever is pending"""
+        self.started = False
+        await self.flush()
+
+    async def record(self, log_data: Dict[str, Any]):
+        """Count a VIEW event, writing at most one entry per key per window"""
+        self.received += 1
+        if self.sample_rate < 1:
+            if random.random() >= self.sample_rate:
+                self.sampled_out += 1
+                return
+            # Lets readers scale counts back up to an estimate of real traffic
+            log_data["details"] = {**log_data["details"], "sampleRate": self.sample_rate}
+
+        # Outside the app lifecycle nothing would flush a pending window, so write through
+        if self.window <= 0 or not self.started:
+            await self._emit([log_data])
+            return
+
+        if time.monotonic() - self._window_started >= self.window:
+            await self.flush()
+
+        key = (log_data["userId"], log_data["entityType"], log_data["entityId"])
+        entry = self._pending.get(key)
+        if entry is None:
+            log_data["details"] = {**log_data["details"], "count": 1}
+            self._pending[key] = log_data
+        else:
+            # The entry keeps the first occurrence's timestamp and details
+            entry["details"]["count"] += 1
+            entry["details"]["lastSeen"] = log_data["timestamp"]
+            self.coalesced += 1
+
+        if len(self._pending) >= self.max_pending:
+            await self.flush()
+
+    async def flush(self):
+        """Write every pending entry and start a new window"""
+        pending, self._pending = self._pending, {}
+        self._window_started = time.monotonic()
+        if pending:
+            await self._emit(list(pending.values()))
+
+    async def _emit(self, entries: List[Dict[str, Any]]):
+        self.emitted += len(entries)
+        await log_writer.enqueue_many(entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """Event counters and pending window size"""
+        return {
+            "windowSeconds": self.window,
+            "sampleRate": self.sample_rate,
+            "coalescing": self.started and self.window > 0,
+            "pending": len(self._pending),
+            "received": self.received,
+            "sampledOut": self.sampled_out,
+            "coalesced": self.coalesced,
+            "emitted": self.emitted
+        }
+
+view_events = ViewEventPolicy(
+    window=settings.AUDIT_VIEW_COALESCE_SECONDS,
+    sample_rate=settings.AUDIT_VIEW_SAMPLE_RATE,
+    max_pending=settings.AUDIT_VIEW_MAX_PENDING
+)
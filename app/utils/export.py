@@ -0,0 +1,62 @@
+import csv
+import io
+import json
+from datetime import datetime
+from enum import Enum
+from typing import Any, AsyncIterator, Dict, List
+from bson import ObjectId
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, default=_json_default)
+    if isinstance(value, (ObjectId, datetime, Enum)):
+        return _json_default(value)
+    return value
+
+async def stream_ndjson(
+    documents: AsyncIterator[Dict[str, Any]],
+    rows_per_chunk: int = 500
+) -> AsyncIterator[str]:
+    """Render documents as NDJSON, yielding a chunk every rows_per_chunk rows"""
+    buffer = []
+    async for document in documents:
+        buffer.append(json.dumps(document, default=_json_default))
+        if len(buffer) >= rows_per_chunk:
+            yield "\n".join(buffer) + "\n"
+            buffer = []
+    if buffer:
+        yield "\n".join(buffer) + "\n"
+
+async def stream_csv(
+    documents: AsyncIterator[Dict[str, Any]],
+    columns: List[str],
+    rows_per_chunk: int = 500
+) -> AsyncIterator[str]:
+    """Render documents as CSV with a fixed header, yielding a chunk every rows_per_chunk rows"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    rows = 0
+
+    async for document in documents:
+        writer.writerow([_csv_value(document.get(column)) for column in columns])
+        rows += 1
+        if rows >= rows_per_chunk:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            rows = 0
+
+    if buffer.tell():
+        yield buffer.getvalue()
@@ -0,0 +1,53 @@
+import base64
+from typing import Any, Dict, List, Optional, Tuple
+from bson import json_util
+
+def encode_cursor(payload: Dict[str, Any]) -> str:
+    """Encode a keyset position as an opaque, URL-safe token"""
+    raw = json_util.dumps(payload, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """Decode a token produced by encode_cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json_util.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(payload, dict) or not isinstance(payload.get("v"), list):
+        raise ValueError("Invalid cursor")
+    return payload
+
+def keyset_filter(sort: List[Tuple[str, int]], values: List[Any]) -> Dict[str, Any]:
+    """Build a query matching documents strictly after values in sort order"""
+    clauses = []
+    for i, (field, direction) in enumerate(sort):
+        clause = {sort[j][0]: values[j] for j in range(i)}
+        clause[field] = {"$gt" if direction == 1 else "$lt": values[i]}
+        clauses.append(clause)
+    return clauses[0] if len(clauses) == 1 else {"$or": clauses}
+
+def cursor_from_document(sort: List[Tuple[str, int]], document: Dict[str, Any]) -> str:
+    """Build the cursor pointing just after document"""
+    return encode_cursor({
+        "s": [[field, direction] for field, direction in sort],
+        "v": [document.get(field) for field, _ in sort]
+    })
+
+def resume_filter(sort: List[Tuple[str, int]], cursor: str) -> Dict[str, Any]:
+    """Decode a cursor and turn it into a keyset filter for the given sort"""
+    payload = decode_cursor(cursor)
+    if payload.get("s") and [tuple(item) for item in payload["s"]] != list(sort):
+        raise ValueError("Cursor does not match the requested sort order")
+    if len(payload["v"]) != len(sort):
+        raise ValueError("Invalid cursor")
+    return keyset_filter(sort, payload["v"])
+
+async def count_documents(collection, query: Dict[str, Any], mode: str = "exact") -> Optional[int]:
+    """Count matches exactly, estimate from collection metadata, or skip counting"""
+    if mode == "none":
+        return None
+    # Metadata counts ignore the query, so a filtered count is always exact
+    if mode == "estimated" and not query:
+        return await collection.estimated_document_count()
+    return await collection.count_documents(query)